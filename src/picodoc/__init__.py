@@ -2,14 +2,32 @@
 
 from __future__ import annotations
 
+from functools import cache
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from picodoc.ast import Document
     from picodoc.filters import FilterRegistry
 
 __version__ = "0.1.0"
 
 
+@cache
+def _pipeline() -> tuple[
+    Callable[[str, str], Document],
+    Callable[..., Document],
+    Callable[[Document], str],
+]:
+    """Import the compiler stages on first use (keeps ``import picodoc`` light)."""
+    from picodoc.eval import evaluate
+    from picodoc.parser import parse
+    from picodoc.render import render
+
+    return parse, evaluate, render
+
+
 def compile(
     source: str,
     filename: str = "input.pdoc",
@@ -17,10 +35,7 @@ def compile(
     filters: FilterRegistry | None = None,
 ) -> str:
     """Parse, evaluate, and render PicoDoc source to HTML."""
-    from picodoc.eval import evaluate
-    from picodoc.parser import parse
-    from picodoc.render import render
-
+    parse, evaluate, render = _pipeline()
     doc = parse(source, filename)
     doc = evaluate(doc, filename, env=env, filters=filters)
     return render(doc)
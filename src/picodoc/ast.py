@@ -1,61 +1,58 @@
-"""AST node types for PicoDoc parsed documents."""
+"""AST node types for PicoDoc parsed documents.
+
+Nodes are NamedTuples (cheap to allocate); ``==`` is plain tuple equality,
+so compare node types explicitly where it matters.
+"""
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from typing import NamedTuple
 
 from picodoc.tokens import Span
 
 
-@dataclass(frozen=True, slots=True)
-class Text:
+class Text(NamedTuple):
     """Coalesced text content."""
 
     value: str
     span: Span
 
 
-@dataclass(frozen=True, slots=True)
-class Escape:
+class Escape(NamedTuple):
     """Resolved prose escape character."""
 
     value: str
     span: Span
 
 
-@dataclass(frozen=True, slots=True)
-class RawString:
+class RawString(NamedTuple):
     """Raw string literal (no escape processing)."""
 
     value: str
     span: Span
 
 
-@dataclass(frozen=True, slots=True)
-class RequiredMarker:
+class RequiredMarker(NamedTuple):
     """The '?' token in #set parameter definitions."""
 
     span: Span
 
 
-@dataclass(frozen=True, slots=True)
-class CodeSection:
+class CodeSection(NamedTuple):
     """Code mode section \\[...] inside an interpreted string."""
 
     body: tuple[Text | Escape | MacroCall, ...]
     span: Span
 
 
-@dataclass(frozen=True, slots=True)
-class InterpString:
+class InterpString(NamedTuple):
     """Interpreted string literal with possible code sections."""
 
     parts: tuple[Text | CodeSection, ...]
     span: Span
 
 
-@dataclass(frozen=True, slots=True)
-class NamedArg:
+class NamedArg(NamedTuple):
     """Named argument: name=value."""
 
     name: str
@@ -64,16 +61,14 @@ class NamedArg:
     span: Span
 
 
-@dataclass(frozen=True, slots=True)
-class Body:
+class Body(NamedTuple):
     """Body content for macro calls (colon-delimited)."""
 
     children: tuple[Text | Escape | MacroCall, ...]
     span: Span
 
 
-@dataclass(frozen=True, slots=True)
-class MacroCall:
+class MacroCall(NamedTuple):
     """A macro invocation: #name or [#name ...]."""
 
     name: str
@@ -83,16 +78,14 @@ class MacroCall:
     span: Span
 
 
-@dataclass(frozen=True, slots=True)
-class Paragraph:
+class Paragraph(NamedTuple):
     """Bare paragraph — evaluator wraps in implicit #p."""
 
     body: tuple[Text | Escape | MacroCall, ...]
     span: Span
 
 
-@dataclass(frozen=True, slots=True)
-class Document:
+class Document(NamedTuple):
     """Root document node."""
 
     children: tuple[MacroCall | Paragraph, ...]
@@ -2,22 +2,28 @@
 
 from __future__ import annotations
 
+import sys
 from dataclasses import dataclass
 
-# Alias map: alternate name -> canonical name
+# Alias map: alternate name -> canonical name (interned, looked up on every call)
 ALIASES: dict[str, str] = {
-    "-": "title",
-    "h1": "title",
-    "--": "h2",
-    "---": "h3",
-    "**": "b",
-    "__": "i",
-    "li": "*",
+    sys.intern(alias): sys.intern(canonical)
+    for alias, canonical in {
+        "-": "title",
+        "h1": "title",
+        "--": "h2",
+        "---": "h3",
+        "**": "b",
+        "__": "i",
+        "li": "*",
+    }.items()
 }
 
 
 def resolve_name(name: str) -> str:
     """Resolve an alias to its canonical name."""
+    # Not memoized on purpose: this is already a single dict probe, and a
+    # functools.cache wrapper (which hashes an argument key) measures slower.
     return ALIASES.get(name, name)
 
 
@@ -38,57 +44,47 @@ class BuiltinDef:
     has_body: bool
 
 
-def _make_builtins() -> dict[str, BuiltinDef]:
-    defs: dict[str, BuiltinDef] = {}
-
-    def d(name: str, params: tuple[ParamDecl, ...] = (), *, has_body: bool = False) -> None:
-        defs[name] = BuiltinDef(name, params, has_body)
-
+# Built as a single literal so the dict is allocated at its final size
+BUILTINS: dict[str, BuiltinDef] = {
     # Structural
-    d("title", has_body=True)
-    d("h2", has_body=True)
-    d("h3", has_body=True)
-    d("h4", has_body=True)
-    d("h5", has_body=True)
-    d("h6", has_body=True)
-    d("p", has_body=True)
-    d("hr")
-
+    "title": BuiltinDef("title", (), True),
+    "h2": BuiltinDef("h2", (), True),
+    "h3": BuiltinDef("h3", (), True),
+    "h4": BuiltinDef("h4", (), True),
+    "h5": BuiltinDef("h5", (), True),
+    "h6": BuiltinDef("h6", (), True),
+    "p": BuiltinDef("p", (), True),
+    "hr": BuiltinDef("hr", (), False),
     # Inline
-    d("b", has_body=True)
-    d("i", has_body=True)
-    d("url", (ParamDecl("link", True), ParamDecl("text", False)), has_body=True)
-
+    "b": BuiltinDef("b", (), True),
+    "i": BuiltinDef("i", (), True),
+    "url": BuiltinDef("url", (ParamDecl("link", True), ParamDecl("text", False)), True),
     # Code / literal
-    d("code", (ParamDecl("language", False),), has_body=True)
-    d("literal", has_body=True)
-
+    "code": BuiltinDef("code", (ParamDecl("language", False),), True),
+    "literal": BuiltinDef("literal", (), True),
     # Lists
-    d("ul", has_body=True)
-    d("ol", has_body=True)
-    d("*", has_body=True)
-
+    "ul": BuiltinDef("ul", (), True),
+    "ol": BuiltinDef("ol", (), True),
+    "*": BuiltinDef("*", (), True),
     # Tables
-    d("table", has_body=True)
-    d("tr", has_body=True)
-    d("td", (ParamDecl("span", False),), has_body=True)
-    d("th", (ParamDecl("span", False),), has_body=True)
-
+    "table": BuiltinDef("table", (), True),
+    "tr": BuiltinDef("tr", (), True),
+    "td": BuiltinDef("td", (ParamDecl("span", False),), True),
+    "th": BuiltinDef("th", (ParamDecl("span", False),), True),
     # Document
-    d("meta", (ParamDecl("name", False), ParamDecl("property", False), ParamDecl("content", True)))
-    d("link", (ParamDecl("rel", True), ParamDecl("href", True)))
-    d("script", (ParamDecl("src", False),), has_body=True)
-    d("lang", has_body=True)
-
+    "meta": BuiltinDef(
+        "meta",
+        (ParamDecl("name", False), ParamDecl("property", False), ParamDecl("content", True)),
+        False,
+    ),
+    "link": BuiltinDef("link", (ParamDecl("rel", True), ParamDecl("href", True)), False),
+    "script": BuiltinDef("script", (ParamDecl("src", False),), True),
+    "lang": BuiltinDef("lang", (), True),
     # Expansion-time
-    d("comment", has_body=True)
-    d("set", (ParamDecl("name", True),), has_body=True)
-    d("ifeq", (ParamDecl("lhs", True), ParamDecl("rhs", True)), has_body=True)
-    d("ifne", (ParamDecl("lhs", True), ParamDecl("rhs", True)), has_body=True)
-    d("ifset", (ParamDecl("name", True),), has_body=True)
-    d("include", (ParamDecl("file", True),))
-
-    return defs
-
-
-BUILTINS: dict[str, BuiltinDef] = _make_builtins()
+    "comment": BuiltinDef("comment", (), True),
+    "set": BuiltinDef("set", (ParamDecl("name", True),), True),
+    "ifeq": BuiltinDef("ifeq", (ParamDecl("lhs", True), ParamDecl("rhs", True)), True),
+    "ifne": BuiltinDef("ifne", (ParamDecl("lhs", True), ParamDecl("rhs", True)), True),
+    "ifset": BuiltinDef("ifset", (ParamDecl("name", True),), True),
+    "include": BuiltinDef("include", (ParamDecl("file", True),), False),
+}
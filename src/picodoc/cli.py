@@ -2,19 +2,15 @@
 
 from __future__ import annotations
 
-import argparse
 import sys
-import time
-import tomllib
-from dataclasses import dataclass
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any, NamedTuple
 
-from picodoc.errors import EvalError, LexError, ParseError
+if TYPE_CHECKING:
+    import argparse
 
 
-@dataclass(frozen=True, slots=True)
-class CliOptions:
+class CliOptions(NamedTuple):
     """Parsed CLI options."""
 
     input_file: Path
@@ -27,10 +23,13 @@ class CliOptions:
     filter_timeout: float
     watch: bool
     debug: bool
+    persistent_filters: frozenset[str] = frozenset()
 
 
 def build_parser() -> argparse.ArgumentParser:
     """Build the argument parser (separate function for testability)."""
+    import argparse
+
     p = argparse.ArgumentParser(
         prog="picodoc",
         description="PicoDoc markup language compiler",
@@ -85,6 +84,13 @@ def build_parser() -> argparse.ArgumentParser:
         metavar="SECS",
         help="Filter execution timeout in seconds (default: 5.0)",
     )
+    p.add_argument(
+        "--persistent-filter",
+        action="append",
+        default=[],
+        metavar="NAME",
+        help="Keep filter NAME running across calls (line protocol; repeatable)",
+    )
     p.add_argument("--watch", action="store_true", help="Watch for changes and recompile")
     p.add_argument("--debug", action="store_true", help="Dump AST to stderr")
     return p
@@ -93,6 +99,8 @@ def build_parser() -> argparse.ArgumentParser:
 def parse_env_arg(s: str) -> tuple[str, str]:
     """Parse a NAME=VALUE string into (name, value)."""
     if "=" not in s:
+        import argparse
+
         raise argparse.ArgumentTypeError(f"invalid env format (expected NAME=VALUE): {s}")
     name, _, value = s.partition("=")
     return name, value
@@ -101,6 +109,8 @@ def parse_env_arg(s: str) -> tuple[str, str]:
 def parse_meta_arg(s: str) -> tuple[str, str]:
     """Parse a NAME=VALUE string into (name, value) for meta tags."""
     if "=" not in s:
+        import argparse
+
         raise argparse.ArgumentTypeError(f"invalid meta format (expected NAME=VALUE): {s}")
     name, _, value = s.partition("=")
     return name, value
@@ -113,10 +123,24 @@ def load_config(config_path: Path | None, input_dir: Path) -> dict[str, Any]:
     if not path.is_file():
         return {}
 
+    import tomllib
+
     with open(path, "rb") as f:
         return tomllib.load(f)
 
 
+def _cfg_table(config: dict[str, Any], key: str) -> dict[str, Any]:
+    """Return the TOML table at *key*, or an empty dict if absent or not a table."""
+    value = config.get(key)
+    return value if isinstance(value, dict) else {}
+
+
+def _cfg_list(table: dict[str, Any], key: str) -> list[Any]:
+    """Return the array at *key* in *table*, or an empty list if absent or not an array."""
+    value = table.get(key)
+    return value if isinstance(value, list) else []
+
+
 def resolve_options(args: argparse.Namespace) -> CliOptions:
     """Merge config file and CLI args into CliOptions.
 
@@ -130,61 +154,38 @@ def resolve_options(args: argparse.Namespace) -> CliOptions:
     config_path = Path(args.config) if args.config else None
     config = load_config(config_path, input_dir)
 
+    filters_cfg = _cfg_table(config, "filters")
+
     # Environment variables: config < CLI
-    env: dict[str, str] = {}
-    cfg_env = config.get("env")
-    if isinstance(cfg_env, dict):
-        for k, v in cfg_env.items():
-            env[str(k)] = str(v)
+    env = {str(k): str(v) for k, v in _cfg_table(config, "env").items()}
     for raw in args.env:
         name, value = parse_env_arg(raw)
         env[name] = value
 
-    # CSS files: config < CLI
-    css_files: list[str] = []
-    cfg_css = config.get("css")
-    if isinstance(cfg_css, dict):
-        cfg_css_files = cfg_css.get("files")
-        if isinstance(cfg_css_files, list):
-            css_files.extend(str(f) for f in cfg_css_files)
-    css_files.extend(args.css)
-
-    # JS files: config < CLI
-    js_files: list[str] = []
-    cfg_js = config.get("js")
-    if isinstance(cfg_js, dict):
-        cfg_js_files = cfg_js.get("files")
-        if isinstance(cfg_js_files, list):
-            js_files.extend(str(f) for f in cfg_js_files)
-    js_files.extend(args.js)
+    # CSS / JS files: config < CLI
+    css_files = [str(f) for f in (*_cfg_list(_cfg_table(config, "css"), "files"), *args.css)]
+    js_files = [str(f) for f in (*_cfg_list(_cfg_table(config, "js"), "files"), *args.js)]
 
     # Meta tags: config < CLI
-    meta_tags: list[tuple[str, str]] = []
-    cfg_meta = config.get("meta")
-    if isinstance(cfg_meta, dict):
-        for k, v in cfg_meta.items():
-            meta_tags.append((str(k), str(v)))
-    for raw in args.meta:
-        meta_tags.append(parse_meta_arg(raw))
+    meta_tags = [(str(k), str(v)) for k, v in _cfg_table(config, "meta").items()]
+    meta_tags.extend(parse_meta_arg(raw) for raw in args.meta)
 
     # Filter paths: config < CLI
-    filter_paths: list[Path] = []
-    cfg_filters = config.get("filters")
-    if isinstance(cfg_filters, dict):
-        cfg_fpaths = cfg_filters.get("paths")
-        if isinstance(cfg_fpaths, list):
-            filter_paths.extend(Path(p) for p in cfg_fpaths)
-    filter_paths.extend(Path(p) for p in args.filter_path)
+    filter_paths = [Path(p) for p in (*_cfg_list(filters_cfg, "paths"), *args.filter_path)]
 
     # Filter timeout: config < CLI
     filter_timeout = 5.0
-    if isinstance(cfg_filters, dict):
-        cfg_timeout = cfg_filters.get("timeout")
-        if isinstance(cfg_timeout, (int, float)):
-            filter_timeout = float(cfg_timeout)
+    cfg_timeout = filters_cfg.get("timeout")
+    if isinstance(cfg_timeout, (int, float)):
+        filter_timeout = float(cfg_timeout)
     if args.filter_timeout is not None:
         filter_timeout = args.filter_timeout
 
+    # Persistent filters: config + CLI
+    persistent_filters = frozenset(
+        str(n) for n in (*_cfg_list(filters_cfg, "persistent"), *args.persistent_filter)
+    )
+
     output_file = Path(args.output) if args.output else None
 
     return CliOptions(
@@ -198,6 +199,7 @@ def resolve_options(args: argparse.Namespace) -> CliOptions:
         filter_timeout=filter_timeout,
         watch=args.watch,
         debug=args.debug,
+        persistent_filters=persistent_filters,
     )
 
 
@@ -207,23 +209,25 @@ def compile_file(options: CliOptions) -> str:
     from picodoc.eval import evaluate
     from picodoc.filters import FilterRegistry
     from picodoc.inject import inject_head_items
-    from picodoc.parser import parse
+    from picodoc.parser import parse_cached
     from picodoc.render import render
+    from picodoc.source import read_source
 
-    source = options.input_file.read_text(encoding="utf-8")
-    doc = parse(source, str(options.input_file))
+    source = read_source(options.input_file)
+    # Reuses the AST when an unchanged file is recompiled (e.g. watch mode)
+    doc = parse_cached(source, str(options.input_file))
 
     doc_dir = options.input_file.parent
     if not doc_dir.parts:
         doc_dir = Path(".")
 
-    filters = FilterRegistry(
+    with FilterRegistry(
         document_dir=doc_dir,
-        extra_paths=list(options.filter_paths),
+        extra_paths=options.filter_paths,
         timeout=options.filter_timeout,
-    )
-
-    doc = evaluate(doc, str(options.input_file), env=options.env, filters=filters)
+        persistent=options.persistent_filters,
+    ) as filters:
+        doc = evaluate(doc, str(options.input_file), env=options.env, filters=filters)
 
     if options.debug:
         dump_ast(doc)
@@ -232,29 +236,86 @@ def compile_file(options: CliOptions) -> str:
     return render(doc)
 
 
+def write_output(options: CliOptions, html: str) -> None:
+    """Write rendered HTML as UTF-8 to the output file, or to stdout."""
+    data = html.encode("utf-8")
+    if options.output_file:
+        options.output_file.write_bytes(data)
+        return
+    # Bypass the text layer when stdout has a binary buffer (not e.g. StringIO)
+    buffer = getattr(sys.stdout, "buffer", None)
+    if buffer is None:
+        sys.stdout.write(html)
+        sys.stdout.flush()
+        return
+    sys.stdout.flush()
+    buffer.write(data)
+    buffer.flush()
+
+
+def _compile_and_write(options: CliOptions) -> None:
+    """Compile once for watch mode, reporting errors instead of raising."""
+    from picodoc.errors import EvalError, LexError, ParseError
+
+    try:
+        write_output(options, compile_file(options))
+        print(f"Compiled {options.input_file}", file=sys.stderr)
+    except (LexError, ParseError, EvalError) as exc:
+        print(str(exc), file=sys.stderr)
+    except (OSError, UnicodeDecodeError) as exc:
+        # e.g. the input file is briefly missing mid-save; wait for the next change
+        print(f"error: {exc}", file=sys.stderr)
+
+
 def watch_loop(options: CliOptions) -> None:
-    """Poll input file for changes, recompile on each modification."""
-    last_mtime = 0.0
+    """Recompile the input file on each modification.
+
+    Uses filesystem notifications via ``watchfiles`` when installed
+    (``picodoc[watch]``), otherwise falls back to polling the mtime.
+    """
     print(f"Watching {options.input_file} for changes...", file=sys.stderr)
+    try:
+        from watchfiles import Change, watch
+    except ImportError:
+        _poll_loop(options)
+        return
+
+    # Watch the directory rather than the file so editors that save by
+    # replacing the file (write + rename) keep triggering recompiles.
+    target = options.input_file.resolve()
+    try:
+        _compile_and_write(options)
+        for _changes in watch(
+            target.parent,
+            watch_filter=lambda change, path: change != Change.deleted and Path(path) == target,
+            recursive=False,
+        ):
+            _compile_and_write(options)
+    except KeyboardInterrupt:
+        pass
+
+
+def _poll_loop(options: CliOptions) -> None:
+    """Poll input file mtime, recompile on each modification."""
+    import os
+    import time
+
+    path = os.fspath(options.input_file)
+    # Size is compared too: on filesystems with coarse mtimes, two saves within
+    # the same tick would otherwise look unchanged. Symlinks are followed so an
+    # edit to the target is seen.
+    last_sig: tuple[int, int] | None = None
     try:
         while True:
             try:
-                mtime = options.input_file.stat().st_mtime
+                st = os.stat(path)
             except OSError:
                 time.sleep(0.5)
                 continue
-            if mtime != last_mtime:
-                last_mtime = mtime
-                try:
-                    html = compile_file(options)
-                    if options.output_file:
-                        options.output_file.write_text(html, encoding="utf-8")
-                    else:
-                        sys.stdout.write(html)
-                        sys.stdout.flush()
-                    print(f"Compiled {options.input_file}", file=sys.stderr)
-                except (LexError, ParseError, EvalError) as exc:
-                    print(str(exc), file=sys.stderr)
+            sig = (st.st_mtime_ns, st.st_size)
+            if sig != last_sig:
+                last_sig = sig
+                _compile_and_write(options)
             time.sleep(0.5)
     except KeyboardInterrupt:
         pass
@@ -262,6 +323,10 @@ def watch_loop(options: CliOptions) -> None:
 
 def main(argv: list[str] | None = None) -> int:
     """CLI entry point. Returns exit code (0/1/2). Does not call sys.exit()."""
+    import argparse
+
+    from picodoc.errors import EvalError, LexError, ParseError
+
     parser = build_parser()
     args = parser.parse_args(argv)
 
@@ -284,9 +349,5 @@ def main(argv: list[str] | None = None) -> int:
         print(str(exc), file=sys.stderr)
         return 2
 
-    if options.output_file:
-        options.output_file.write_text(html, encoding="utf-8")
-    else:
-        sys.stdout.write(html)
-
+    write_output(options, html)
     return 0
@@ -2,8 +2,10 @@
 
 from __future__ import annotations
 
+import io
 import sys
-from typing import TextIO
+from collections.abc import Callable
+from typing import Any, TextIO
 
 from picodoc.ast import (
     Body,
@@ -21,21 +23,30 @@ from picodoc.ast import (
 
 
 def dump_ast(doc: Document, *, file: TextIO = sys.stderr) -> None:
-    """Print a human-readable AST tree to *file*."""
-    _dump_document(doc, 0, file)
+    """Print a human-readable AST tree to *file*.
+
+    The tree is built in memory and written with a single call.
+    """
+    buf = io.StringIO()
+    _dump_document(doc, 0, buf)
+    file.write(buf.getvalue())
+
+
+_INDENTS: tuple[str, ...] = tuple("  " * depth for depth in range(64))
 
 
 def _indent(depth: int) -> str:
+    if depth < len(_INDENTS):
+        return _INDENTS[depth]
     return "  " * depth
 
 
 def _dump_document(doc: Document, depth: int, f: TextIO) -> None:
     f.write(f"{_indent(depth)}Document\n")
     for child in doc.children:
-        if isinstance(child, MacroCall):
-            _dump_macro(child, depth + 1, f)
-        elif isinstance(child, Paragraph):
-            _dump_paragraph(child, depth + 1, f)
+        dump = _TOP_DUMPERS.get(type(child))
+        if dump is not None:
+            dump(child, depth + 1, f)
 
 
 def _dump_macro(node: MacroCall, depth: int, f: TextIO) -> None:
@@ -57,52 +68,92 @@ def _dump_value_inline(
     value: Text | InterpString | RawString | MacroCall | RequiredMarker,
     f: TextIO,
 ) -> None:
-    if isinstance(value, Text):
-        f.write(f"Text({value.value!r})")
-    elif isinstance(value, RawString):
-        f.write(f"RawString({value.value!r})")
-    elif isinstance(value, InterpString):
-        f.write("InterpString(")
-        for part in value.parts:
-            if isinstance(part, Text):
-                f.write(f"Text({part.value!r})")
-            elif isinstance(part, CodeSection):
-                f.write("Code[...]")
-        f.write(")")
-    elif isinstance(value, MacroCall):
-        f.write(f"MacroCall(#{value.name})")
-    elif isinstance(value, RequiredMarker):
-        f.write("?")
+    fmt = _INLINE_FORMATTERS.get(type(value))
+    if fmt is not None:
+        f.write(fmt(value))
+
+
+def _inline_interp(value: InterpString) -> str:
+    parts = []
+    for part in value.parts:
+        if type(part) is Text:
+            parts.append(f"Text({part.value!r})")
+        elif type(part) is CodeSection:
+            parts.append("Code[...]")
+    return f"InterpString({''.join(parts)})"
 
 
 def _dump_body(body: Body | InterpString | RawString, depth: int, f: TextIO) -> None:
-    if isinstance(body, Body):
-        f.write(f"{_indent(depth)}Body\n")
-        for child in body.children:
-            _dump_child(child, depth + 1, f)
-    elif isinstance(body, InterpString):
-        f.write(f"{_indent(depth)}InterpString\n")
-        for part in body.parts:
-            if isinstance(part, Text):
-                f.write(f"{_indent(depth + 1)}Text({part.value!r})\n")
-            elif isinstance(part, CodeSection):
-                f.write(f"{_indent(depth + 1)}CodeSection\n")
-                for child in part.body:
-                    _dump_child(child, depth + 2, f)
-    elif isinstance(body, RawString):
-        f.write(f"{_indent(depth)}RawString({body.value!r})\n")
+    dump = _BODY_DUMPERS.get(type(body))
+    if dump is not None:
+        dump(body, depth, f)
+
+
+def _dump_block_body(body: Body, depth: int, f: TextIO) -> None:
+    f.write(f"{_indent(depth)}Body\n")
+    for child in body.children:
+        _dump_child(child, depth + 1, f)
+
+
+def _dump_interp_body(body: InterpString, depth: int, f: TextIO) -> None:
+    f.write(f"{_indent(depth)}InterpString\n")
+    for part in body.parts:
+        if type(part) is Text:
+            f.write(f"{_indent(depth + 1)}Text({part.value!r})\n")
+        elif type(part) is CodeSection:
+            f.write(f"{_indent(depth + 1)}CodeSection\n")
+            for child in part.body:
+                _dump_child(child, depth + 2, f)
+
+
+def _dump_raw_body(body: RawString, depth: int, f: TextIO) -> None:
+    f.write(f"{_indent(depth)}RawString({body.value!r})\n")
 
 
 def _dump_child(child: Text | Escape | MacroCall, depth: int, f: TextIO) -> None:
-    if isinstance(child, Text):
-        f.write(f"{_indent(depth)}Text({child.value!r})\n")
-    elif isinstance(child, Escape):
-        f.write(f"{_indent(depth)}Escape({child.value!r})\n")
-    elif isinstance(child, MacroCall):
-        _dump_macro(child, depth, f)
+    dump = _CHILD_DUMPERS.get(type(child))
+    if dump is not None:
+        dump(child, depth, f)
+
+
+def _dump_text(child: Text, depth: int, f: TextIO) -> None:
+    f.write(f"{_indent(depth)}Text({child.value!r})\n")
+
+
+def _dump_escape(child: Escape, depth: int, f: TextIO) -> None:
+    f.write(f"{_indent(depth)}Escape({child.value!r})\n")
 
 
 def _dump_paragraph(para: Paragraph, depth: int, f: TextIO) -> None:
     f.write(f"{_indent(depth)}Paragraph\n")
     for child in para.body:
         _dump_child(child, depth + 1, f)
+
+
+# Dispatch tables keyed on exact node type (AST node classes are never subclassed)
+_Dumper = Callable[[Any, int, TextIO], None]
+
+_TOP_DUMPERS: dict[type, _Dumper] = {
+    MacroCall: _dump_macro,
+    Paragraph: _dump_paragraph,
+}
+
+_BODY_DUMPERS: dict[type, _Dumper] = {
+    Body: _dump_block_body,
+    InterpString: _dump_interp_body,
+    RawString: _dump_raw_body,
+}
+
+_CHILD_DUMPERS: dict[type, _Dumper] = {
+    Text: _dump_text,
+    Escape: _dump_escape,
+    MacroCall: _dump_macro,
+}
+
+_INLINE_FORMATTERS: dict[type, Callable[[Any], str]] = {
+    Text: lambda v: f"Text({v.value!r})",
+    RawString: lambda v: f"RawString({v.value!r})",
+    InterpString: _inline_interp,
+    MacroCall: lambda v: f"MacroCall(#{v.name})",
+    RequiredMarker: lambda v: "?",
+}
@@ -5,6 +5,64 @@ from __future__ import annotations
 from picodoc.tokens import Position, Span
 
 
+def _source_line(source: str, line: int) -> str:
+    """Return 1-based *line* of *source* without its terminator ("" if out of range).
+
+    Walks newlines with ``str.find`` so only the requested line is sliced.
+    """
+    if line < 1:
+        return ""
+    pos = -1
+    for _ in range(line - 1):
+        pos = source.find("\n", pos + 1)
+        if pos == -1:
+            return ""
+    start = pos + 1
+    end = source.find("\n", start)
+    if end == -1:
+        end = len(source)
+    return source[start:end].rstrip("\r")
+
+
+def _format_diag(
+    message: str,
+    filename: str,
+    line: int,
+    col: int,
+    source_line: str,
+    underline_len: int,
+) -> str:
+    """Render an error message with a gutter, source line, and caret underline."""
+    pad = " " * (col - 1)
+    carets = "^" * underline_len
+
+    line_num = str(line)
+    gutter_width = len(line_num) + 1
+
+    blank_gutter = " " * gutter_width + "|"
+    line_gutter = f"{line_num:>{gutter_width - 1}} |"
+
+    return (
+        f"error: {message}\n"
+        f"{' ' * gutter_width}--> {filename}:{line}:{col}\n"
+        f"{blank_gutter}\n"
+        f"{line_gutter} {source_line}\n"
+        f"{blank_gutter} {pad}{carets}"
+    )
+
+
+def _format_span(message: str, filename: str, span: Span, source: str) -> str:
+    """Render a span-based error, underlining the span (or to end of line if multi-line)."""
+    line = span.start.line
+    col = span.start.column
+    source_line = _source_line(source, line)
+    if span.end.line == line:
+        underline_len = max(1, span.end.column - col)
+    else:
+        underline_len = max(1, len(source_line) - col + 1)
+    return _format_diag(message, filename, line, col, source_line, underline_len)
+
+
 class LexError(Exception):
     """Raised on the first lexing error, with position and source context."""
 
@@ -15,35 +73,14 @@ class LexError(Exception):
         super().__init__(self.format())
 
     def format(self, filename: str = "input.pdoc") -> str:
-        lines = self.source.splitlines(keepends=True)
-        line_idx = self.position.line - 1
+        line = self.position.line
         col = self.position.column
-
-        # Build the source line (strip trailing newline for display)
-        if 0 <= line_idx < len(lines):
-            source_line = lines[line_idx].rstrip("\n").rstrip("\r")
-        else:
-            source_line = ""
+        source_line = _source_line(self.source, line)
 
         # Compute underline length — at least 1 char, but stay within line
         underline_len = max(1, min(2, len(source_line) - col + 1))
 
-        pad = " " * (col - 1)
-        carets = "^" * underline_len
-
-        line_num = str(self.position.line)
-        gutter_width = len(line_num) + 1
-
-        blank_gutter = " " * gutter_width + "|"
-        line_gutter = f"{line_num:>{gutter_width - 1}} |"
-
-        return (
-            f"error: {self.message}\n"
-            f"{' ' * gutter_width}--> {filename}:{self.position.line}:{col}\n"
-            f"{blank_gutter}\n"
-            f"{line_gutter} {source_line}\n"
-            f"{blank_gutter} {pad}{carets}"
-        )
+        return _format_diag(self.message, filename, line, col, source_line, underline_len)
 
 
 class ParseError(Exception):
@@ -56,37 +93,7 @@ class ParseError(Exception):
         super().__init__(self.format())
 
     def format(self, filename: str = "input.pdoc") -> str:
-        lines = self.source.splitlines(keepends=True)
-        line_idx = self.span.start.line - 1
-        col = self.span.start.column
-
-        if 0 <= line_idx < len(lines):
-            source_line = lines[line_idx].rstrip("\n").rstrip("\r")
-        else:
-            source_line = ""
-
-        # Underline the full span when on one line, otherwise to end of line
-        if self.span.end.line == self.span.start.line:
-            underline_len = max(1, self.span.end.column - col)
-        else:
-            underline_len = max(1, len(source_line) - col + 1)
-
-        pad = " " * (col - 1)
-        carets = "^" * underline_len
-
-        line_num = str(self.span.start.line)
-        gutter_width = len(line_num) + 1
-
-        blank_gutter = " " * gutter_width + "|"
-        line_gutter = f"{line_num:>{gutter_width - 1}} |"
-
-        return (
-            f"error: {self.message}\n"
-            f"{' ' * gutter_width}--> {filename}:{self.span.start.line}:{col}\n"
-            f"{blank_gutter}\n"
-            f"{line_gutter} {source_line}\n"
-            f"{blank_gutter} {pad}{carets}"
-        )
+        return _format_span(self.message, filename, self.span, self.source)
 
 
 class EvalError(Exception):
@@ -106,36 +113,7 @@ class EvalError(Exception):
         super().__init__(self.format())
 
     def format(self, filename: str = "input.pdoc") -> str:
-        lines = self.source.splitlines(keepends=True)
-        line_idx = self.span.start.line - 1
-        col = self.span.start.column
-
-        if 0 <= line_idx < len(lines):
-            source_line = lines[line_idx].rstrip("\n").rstrip("\r")
-        else:
-            source_line = ""
-
-        if self.span.end.line == self.span.start.line:
-            underline_len = max(1, self.span.end.column - col)
-        else:
-            underline_len = max(1, len(source_line) - col + 1)
-
-        pad = " " * (col - 1)
-        carets = "^" * underline_len
-
-        line_num = str(self.span.start.line)
-        gutter_width = len(line_num) + 1
-
-        blank_gutter = " " * gutter_width + "|"
-        line_gutter = f"{line_num:>{gutter_width - 1}} |"
-
-        result = (
-            f"error: {self.message}\n"
-            f"{' ' * gutter_width}--> {filename}:{self.span.start.line}:{col}\n"
-            f"{blank_gutter}\n"
-            f"{line_gutter} {source_line}\n"
-            f"{blank_gutter} {pad}{carets}"
-        )
+        result = _format_span(self.message, filename, self.span, self.source)
         if self.call_stack:
             chain = " -> ".join(f"#{name}" for name in self.call_stack)
             result += f"\n  in expansion chain: {chain}"
@@ -4,6 +4,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 from pathlib import Path
+from sys import intern
 from typing import TYPE_CHECKING
 
 from picodoc.ast import (
@@ -21,9 +22,13 @@ from picodoc.ast import (
 )
 from picodoc.builtins import BUILTINS, resolve_name
 from picodoc.errors import EvalError
+from picodoc.parser import parse, parse_cached
+from picodoc.source import read_source
 from picodoc.tokens import Span
 
 if TYPE_CHECKING:
+    from collections.abc import Callable, Sequence
+
     from picodoc.filters import FilterRegistry
 
 
@@ -40,6 +45,15 @@ class EvalContext:
     max_call_depth: int = 64
     env: dict[str, str] = field(default_factory=dict)
     filters: FilterRegistry | None = None
+    # Set view of include_stack for O(1) circular-include checks
+    include_set: set[str] = field(init=False)
+    # Include path -> resolved absolute path, so repeated includes skip resolve()
+    resolved_paths: dict[str, str] = field(default_factory=dict, init=False)
+    # Definition name -> (definition node, extracted text); see _definition_text
+    definition_text: dict[str, tuple[MacroCall, str]] = field(default_factory=dict, init=False)
+
+    def __post_init__(self) -> None:
+        self.include_set = set(self.include_stack)
 
 
 def evaluate(
@@ -61,10 +75,15 @@ def evaluate(
     if env:
         ctx.env.update(env)
     _collect_definitions(doc.children, ctx)
-    expanded = _expand_top_level(doc.children, ctx)
-    # Filter to MacroCall nodes — Text/Escape from conditionals are whitespace
-    children = tuple(c for c in expanded if isinstance(c, MacroCall))
-    result = Document(children, doc.span)
+    # Expand and keep only MacroCall nodes in one pass — Text/Escape from
+    # conditionals are whitespace. Includes and filters still need the full
+    # _expand_top_level result, so the filtering is done here rather than there.
+    children: list[MacroCall] = []
+    for child in doc.children:
+        for node in _expand_top_node(child, ctx):
+            if type(node) is MacroCall:
+                children.append(node)
+    result = Document(tuple(children), doc.span)
     _validate_nesting(result)
     return result
 
@@ -74,35 +93,34 @@ def evaluate(
 # ---------------------------------------------------------------------------
 
 # child (resolved name) → set of allowed parent names
-_NESTING_RULES: dict[str, set[str]] = {
-    "tr": {"table"},
-    "td": {"tr"},
-    "th": {"tr"},
-    "*": {"ul", "ol"},
+_NESTING_RULES: dict[str, frozenset[str]] = {
+    "tr": frozenset({"table"}),
+    "td": frozenset({"tr"}),
+    "th": frozenset({"tr"}),
+    "*": frozenset({"ul", "ol"}),
 }
 
 
 def _validate_nesting(doc: Document) -> None:
     """Validate that macro nesting is structurally correct after expansion."""
     for child in doc.children:
-        if isinstance(child, MacroCall):
+        if type(child) is MacroCall:
             _validate_node(child, parent_name=None)
 
 
 def _validate_node(node: MacroCall, parent_name: str | None) -> None:
     name = resolve_name(node.name)
-    if name in _NESTING_RULES:
-        allowed = _NESTING_RULES[name]
-        if parent_name not in allowed:
-            allowed_str = " or ".join(f"#{p}" for p in sorted(allowed))
-            raise EvalError(
-                f"#{node.name} must appear inside {allowed_str}",
-                node.span,
-                "",
-            )
-    if isinstance(node.body, Body):
+    allowed = _NESTING_RULES.get(name)
+    if allowed is not None and parent_name not in allowed:
+        allowed_str = " or ".join(f"#{p}" for p in sorted(allowed))
+        raise EvalError(
+            f"#{node.name} must appear inside {allowed_str}",
+            node.span,
+            "",
+        )
+    if type(node.body) is Body:
         for child in node.body.children:
-            if isinstance(child, MacroCall):
+            if type(child) is MacroCall:
                 _validate_node(child, parent_name=name)
 
 
@@ -117,7 +135,7 @@ def _collect_definitions(
 ) -> None:
     """Scan top-level #set definitions for out-of-order resolution."""
     for child in children:
-        if not isinstance(child, MacroCall):
+        if type(child) is not MacroCall:
             continue
         name = resolve_name(child.name)
         if name != "set":
@@ -125,7 +143,7 @@ def _collect_definitions(
         name_val = _get_arg(child, "name")
         if name_val is None:
             continue
-        def_name = _resolve_value(name_val, ctx)
+        def_name = intern(_resolve_value(name_val, ctx))
         if def_name in ctx.definitions:
             raise EvalError(
                 f"duplicate definition: {def_name}",
@@ -174,41 +192,28 @@ def _expand_macro(
     name = resolve_name(node.name)
 
     if name.startswith("env."):
-        env_key = name[4:]
-        if env_key in ctx.env:
-            return [Text(ctx.env[env_key], node.span)]
+        env_value = ctx.env.get(name[4:])
+        if env_value is not None:
+            return [Text(env_value, node.span)]
         return []
 
-    if name == "comment":
-        return []
-
-    if name == "set":
-        return _expand_set(node, ctx)
-
-    if name == "ifeq":
-        return _expand_ifeq(node, ctx)
-
-    if name == "ifne":
-        return _expand_ifne(node, ctx)
-
-    if name == "ifset":
-        return _expand_ifset(node, ctx)
-
-    if name == "include":
-        return _expand_include(node, ctx)
-
-    if name == "table":
-        return _expand_table(node, ctx)
+    handler = _EXPANSION_HANDLERS.get(name)
+    if handler is not None:
+        return handler(node, ctx)
 
     # User macro expansion
-    if name in ctx.definitions and name not in BUILTINS:
-        return _expand_user_macro(node, name, ctx)
+    defn = ctx.definitions.get(name)
+    if defn is not None and name not in BUILTINS:
+        return _expand_user_macro(node, name, defn, ctx)
 
     # Trailing dot: #version. → expand "version" + Text(".")
-    if name.endswith(".") and name[:-1] in ctx.definitions and name[:-1] not in BUILTINS:
-        expanded = _expand_user_macro(node, name[:-1], ctx)
-        expanded.append(Text(".", node.span))
-        return expanded
+    if name.endswith("."):
+        base = name[:-1]
+        defn = ctx.definitions.get(base)
+        if defn is not None and base not in BUILTINS:
+            expanded = _expand_user_macro(node, base, defn, ctx)
+            expanded.append(Text(".", node.span))
+            return expanded
 
     # External filter dispatch
     if ctx.filters is not None:
@@ -228,22 +233,26 @@ def _recurse_body(
 ) -> Body | InterpString | RawString | None:
     if body is None:
         return None
-    if isinstance(body, Body):
-        expanded = _expand_body_children(body.children, ctx)
-        return Body(tuple(expanded), body.span)
-    if isinstance(body, InterpString):
+    if type(body) is Body:
+        # A body without macro calls expands to itself
+        for child in body.children:
+            if type(child) is MacroCall:
+                expanded = _expand_body_children(body.children, ctx)
+                return Body(tuple(expanded), body.span)
+        return body
+    if type(body) is InterpString:
         return _expand_interp_string(body, ctx)
     # RawString: no expansion needed
     return body
 
 
 def _expand_body_children(
-    children: tuple[Text | Escape | MacroCall, ...],
+    children: Sequence[Text | Escape | MacroCall],
     ctx: EvalContext,
 ) -> list[Text | Escape | MacroCall]:
     result: list[Text | Escape | MacroCall] = []
     for child in children:
-        if isinstance(child, MacroCall):
+        if type(child) is MacroCall:
             result.extend(_expand_macro(child, ctx))
         else:
             result.append(child)
@@ -258,11 +267,10 @@ def _expand_body_children(
 def _expand_user_macro(
     node: MacroCall,
     name: str,
+    defn: MacroCall,
     ctx: EvalContext,
 ) -> list[MacroCall | Text | Escape]:
-    """Expand a user-defined macro call."""
-    defn = ctx.definitions[name]
-
+    """Expand a call to the user-defined macro *name*, whose #set node is *defn*."""
     # Extract param declarations (skip name=)
     params: dict[str, tuple[bool, Text | InterpString | RawString | MacroCall | None]] = {}
     for arg in defn.args:
@@ -274,7 +282,7 @@ def _expand_user_macro(
             params[arg.name] = (False, arg.value)
 
     # Bind call-site args to params
-    bindings: dict[str, list[Text | Escape | MacroCall]] = {}
+    bindings: dict[str, Sequence[Text | Escape | MacroCall]] = {}
     for arg in node.args:
         if arg.name in params:
             bindings[arg.name] = _value_to_body_children(arg.value, node.span)
@@ -312,7 +320,7 @@ def _expand_user_macro(
         # Resolve bindings (expand macro refs in bound values before shadowing)
         resolved_bindings: dict[str, list[Text | Escape | MacroCall]] = {}
         for param_name, raw_values in bindings.items():
-            resolved_bindings[param_name] = _expand_body_children(tuple(raw_values), ctx)
+            resolved_bindings[param_name] = _expand_body_children(raw_values, ctx)
 
         # Scope shadowing: temporarily inject param bindings as definitions
         saved: dict[str, MacroCall] = {}
@@ -381,10 +389,10 @@ def _value_to_body_children(
 def _body_to_children(
     body: Body | InterpString | RawString,
     span: Span,
-) -> list[Text | Escape | MacroCall]:
-    """Convert a body to a list of children."""
+) -> Sequence[Text | Escape | MacroCall]:
+    """Convert a body to a sequence of children (a Body's own tuple, uncopied)."""
     if isinstance(body, Body):
-        return list(body.children)
+        return body.children
     if isinstance(body, InterpString):
         return _interp_to_children(body)
     if isinstance(body, RawString):
@@ -398,9 +406,9 @@ def _interp_to_children(
     """Flatten an InterpString to body children."""
     result: list[Text | Escape | MacroCall] = []
     for part in interp.parts:
-        if isinstance(part, Text):
+        if type(part) is Text:
             result.append(part)
-        elif isinstance(part, CodeSection):
+        elif type(part) is CodeSection:
             result.extend(part.body)
     return result
 
@@ -409,10 +417,12 @@ def _expand_interp_string(
     interp: InterpString,
     ctx: EvalContext,
 ) -> InterpString:
-    """Expand code sections within an InterpString."""
+    """Expand code sections within an InterpString (returned as-is if it has none)."""
+    if not any(type(part) is CodeSection for part in interp.parts):
+        return interp
     new_parts: list[Text | CodeSection] = []
     for part in interp.parts:
-        if isinstance(part, CodeSection):
+        if type(part) is CodeSection:
             expanded = _expand_body_children(part.body, ctx)
             new_parts.append(CodeSection(tuple(expanded), part.span))
         else:
@@ -427,7 +437,7 @@ def _resolve_macro_args(
     """Resolve macro references in argument values for render-time builtins."""
     new_args: list[NamedArg] = []
     for arg in args:
-        if isinstance(arg.value, MacroCall):
+        if type(arg.value) is MacroCall:
             ref = resolve_name(arg.value.name)
             if ref.startswith("env."):
                 text = ctx.env.get(ref[4:], "")
@@ -435,7 +445,7 @@ def _resolve_macro_args(
                 new_args.append(NamedArg(arg.name, new_value, arg.name_span, arg.span))
                 continue
             if ref in ctx.definitions:
-                text = _extract_def_text(ctx.definitions[ref])
+                text = _definition_text(ref, ctx)
                 new_value = Text(text, arg.value.span)
                 new_args.append(NamedArg(arg.name, new_value, arg.name_span, arg.span))
                 continue
@@ -452,47 +462,66 @@ def _resolve_value(
     value: Text | InterpString | RawString | MacroCall | RequiredMarker,
     ctx: EvalContext,
 ) -> str:
-    """Resolve an argument value to plain text."""
-    if isinstance(value, Text):
-        return value.value
-    if isinstance(value, RawString):
+    """Resolve an argument value to plain text.
+
+    AST node classes are never subclassed, so exact type checks stand in
+    for isinstance on this hot path.
+    """
+    if type(value) is Text or type(value) is RawString:
         return value.value
-    if isinstance(value, InterpString):
+    if type(value) is InterpString:
         parts: list[str] = []
         for part in value.parts:
-            if isinstance(part, Text):
+            if type(part) is Text:
                 parts.append(part.value)
-            elif isinstance(part, CodeSection):
+            elif type(part) is CodeSection:
                 for child in part.body:
-                    if isinstance(child, Text):
+                    if type(child) is Text:
                         parts.append(child.value)
-                    elif isinstance(child, MacroCall):
+                    elif type(child) is MacroCall:
                         ref = resolve_name(child.name)
                         if ref.startswith("env."):
                             parts.append(ctx.env.get(ref[4:], ""))
                         elif ref in ctx.definitions:
-                            parts.append(_extract_def_text(ctx.definitions[ref]))
+                            parts.append(_definition_text(ref, ctx))
         return "".join(parts)
-    if isinstance(value, MacroCall):
+    if type(value) is MacroCall:
         ref = resolve_name(value.name)
         if ref.startswith("env."):
             return ctx.env.get(ref[4:], "")
         if ref in ctx.definitions:
-            return _extract_def_text(ctx.definitions[ref])
+            return _definition_text(ref, ctx)
         return ""
     return ""
 
 
+def _definition_text(name: str, ctx: EvalContext) -> str:
+    """Plain text of the current definition of name, extracted once per definition.
+
+    The cache entry keeps the node it was computed from and is only reused
+    while that node is still the active definition, so redefinitions and
+    parameter shadowing never see stale text.
+    """
+    defn = ctx.definitions[name]
+    cached = ctx.definition_text.get(name)
+    if cached is not None and cached[0] is defn:
+        return cached[1]
+    text = _extract_def_text(defn)
+    ctx.definition_text[name] = (defn, text)
+    return text
+
+
 def _extract_def_text(macro: MacroCall) -> str:
     """Extract plain text from a #set definition's body."""
-    if macro.body is None:
+    body = macro.body
+    if body is None:
         return ""
-    if isinstance(macro.body, Body):
-        return "".join(c.value for c in macro.body.children if isinstance(c, (Text, Escape)))
-    if isinstance(macro.body, InterpString):
-        return "".join(p.value for p in macro.body.parts if isinstance(p, Text))
-    if isinstance(macro.body, RawString):
-        return macro.body.value
+    if type(body) is Body:
+        return "".join(c.value for c in body.children if type(c) is Text or type(c) is Escape)
+    if type(body) is InterpString:
+        return "".join(p.value for p in body.parts if type(p) is Text)
+    if type(body) is RawString:
+        return body.value
     return ""
 
 
@@ -506,16 +535,30 @@ def _get_arg(
     return None
 
 
+def _arg_map(
+    node: MacroCall,
+) -> dict[str, Text | InterpString | RawString | MacroCall | RequiredMarker]:
+    """Map argument names to values in one pass (first occurrence wins, like _get_arg)."""
+    args: dict[str, Text | InterpString | RawString | MacroCall | RequiredMarker] = {}
+    for arg in node.args:
+        args.setdefault(arg.name, arg.value)
+    return args
+
+
 # ---------------------------------------------------------------------------
 # Expansion-time builtins
 # ---------------------------------------------------------------------------
 
 
+def _expand_comment(node: MacroCall, ctx: EvalContext) -> list[MacroCall | Text | Escape]:
+    return []
+
+
 def _expand_set(node: MacroCall, ctx: EvalContext) -> list[MacroCall | Text | Escape]:
     name_val = _get_arg(node, "name")
     if name_val is None:
         return []
-    name = _resolve_value(name_val, ctx)
+    name = intern(_resolve_value(name_val, ctx))
     ctx.definitions[name] = node
     if name.startswith("env."):
         ctx.env[name[4:]] = _extract_def_text(node)
@@ -523,8 +566,9 @@ def _expand_set(node: MacroCall, ctx: EvalContext) -> list[MacroCall | Text | Es
 
 
 def _expand_ifeq(node: MacroCall, ctx: EvalContext) -> list[MacroCall | Text | Escape]:
-    lhs_val = _get_arg(node, "lhs")
-    rhs_val = _get_arg(node, "rhs")
+    args = _arg_map(node)
+    lhs_val = args.get("lhs")
+    rhs_val = args.get("rhs")
     if lhs_val is None or rhs_val is None:
         return []
     lhs = _resolve_value(lhs_val, ctx)
@@ -535,8 +579,9 @@ def _expand_ifeq(node: MacroCall, ctx: EvalContext) -> list[MacroCall | Text | E
 
 
 def _expand_ifne(node: MacroCall, ctx: EvalContext) -> list[MacroCall | Text | Escape]:
-    lhs_val = _get_arg(node, "lhs")
-    rhs_val = _get_arg(node, "rhs")
+    args = _arg_map(node)
+    lhs_val = args.get("lhs")
+    rhs_val = args.get("rhs")
     if lhs_val is None or rhs_val is None:
         return []
     lhs = _resolve_value(lhs_val, ctx)
@@ -575,7 +620,10 @@ def _expand_include(node: MacroCall, ctx: EvalContext) -> list[MacroCall | Text
         return []
     filename = _resolve_value(file_val, ctx)
     filepath = ctx.source_dir / filename
-    resolved = str(filepath.resolve())
+    key = str(filepath)
+    resolved = ctx.resolved_paths.get(key)
+    if resolved is None:
+        resolved = ctx.resolved_paths[key] = str(filepath.resolve())
 
     if len(ctx.include_stack) >= ctx.max_include_depth:
         raise EvalError(
@@ -584,7 +632,7 @@ def _expand_include(node: MacroCall, ctx: EvalContext) -> list[MacroCall | Text
             "",
         )
 
-    if resolved in ctx.include_stack:
+    if resolved in ctx.include_set:
         raise EvalError(
             f"circular include detected: {filename}",
             node.span,
@@ -592,7 +640,7 @@ def _expand_include(node: MacroCall, ctx: EvalContext) -> list[MacroCall | Text
         )
 
     try:
-        content = filepath.read_text(encoding="utf-8")
+        content = read_source(filepath)
     except FileNotFoundError:
         raise EvalError(
             f"included file not found: {filename}",
@@ -600,15 +648,16 @@ def _expand_include(node: MacroCall, ctx: EvalContext) -> list[MacroCall | Text
             "",
         ) from None
 
-    from picodoc.parser import parse
-
-    included_doc = parse(content, str(filepath))
+    # Files included repeatedly (headers, footers) are only parsed once
+    included_doc = parse_cached(content, str(filepath))
 
     ctx.include_stack.append(resolved)
+    ctx.include_set.add(resolved)
     try:
         result = _expand_top_level(included_doc.children, ctx)
     finally:
         ctx.include_stack.pop()
+        ctx.include_set.discard(resolved)
 
     return result
 
@@ -629,8 +678,6 @@ def _expand_filter(
     body_text = _extract_body_text(node.body) if node.body else None
     assert ctx.filters is not None
     markup = ctx.filters.invoke_filter(name, filter_path, args_dict, body_text, ctx.env, node.span)
-    from picodoc.parser import parse
-
     filter_doc = parse(markup, f"<filter:{name}>")
     return _expand_top_level(filter_doc.children, ctx)
 
@@ -658,10 +705,7 @@ def _expand_table(
     if not isinstance(node.body, Body):
         return [MacroCall(node.name, node.args, node.body, node.bracketed, node.span)]
 
-    # Check for pipe characters in text children
-    has_pipe = any(isinstance(c, Text) and "|" in c.value for c in node.body.children)
-
-    if not has_pipe:
+    if not _has_pipe(node.body.children):
         # No pipes — recurse into body and pass through for render-time
         new_body = _recurse_body(node.body, ctx)
         return [MacroCall(node.name, node.args, new_body, node.bracketed, node.span)]
@@ -684,6 +728,11 @@ def _expand_table(
     return [MacroCall("table", (), table_body, node.bracketed, node.span)]
 
 
+def _has_pipe(children: Sequence[Text | Escape | MacroCall]) -> bool:
+    """Return True if any Text child contains a pipe character."""
+    return any(type(child) is Text and "|" in child.value for child in children)
+
+
 def _parse_pipe_rows(
     body: Body,
     span: Span,
@@ -694,71 +743,88 @@ def _parse_pipe_rows(
     rows: list[list[list[Text | Escape | MacroCall]]] = [[[]]]
 
     for child in body.children:
-        if isinstance(child, Text):
+        if type(child) is Text:
             _split_text_into_rows(child, rows)
-        elif isinstance(child, MacroCall):
-            expanded = _expand_macro(child, ctx)
-            for node in expanded:
-                rows[-1][-1].append(node)
+        elif type(child) is MacroCall:
+            rows[-1][-1].extend(_expand_macro(child, ctx))
         else:
             rows[-1][-1].append(child)
 
-    # Filter empty rows (all cells empty)
-    rows = [r for r in rows if any(cell for cell in r)]
-
-    # Trim whitespace from each cell
+    # Trim whitespace from each cell, keeping rows with at least one non-empty cell
+    result: list[list[list[Text | Escape | MacroCall]]] = []
     for row in rows:
         for cell in row:
             _trim_cell(cell)
-
-    # Remove rows where all cells are empty after trimming
-    rows = [r for r in rows if any(cell for cell in r)]
-
-    return rows
+        if any(row):
+            result.append(row)
+    return result
 
 
 def _split_text_into_rows(
     text_node: Text,
     rows: list[list[list[Text | Escape | MacroCall]]],
 ) -> None:
-    """Split a Text node at newlines and pipes, distributing into rows/cells."""
-    remaining = text_node.value
-    while remaining:
-        nl = remaining.find("\n")
-        pipe = remaining.find("|")
-        if nl == -1 and pipe == -1:
-            if remaining:
-                rows[-1][-1].append(Text(remaining, text_node.span))
-            break
-        elif nl >= 0 and (pipe == -1 or nl < pipe):
-            before = remaining[:nl]
-            if before:
-                rows[-1][-1].append(Text(before, text_node.span))
+    """Split a Text node at newlines and pipes, distributing into rows/cells.
+
+    A chunk with a delimiter on both sides is a complete cell, so it is
+    trimmed here; only cells that span several nodes are left for _trim_cell.
+    """
+    span = text_node.span
+    lines = text_node.value.split("\n")
+    last_line = len(lines) - 1
+    for i, line in enumerate(lines):
+        if i:
             rows.append([[]])
-            remaining = remaining[nl + 1 :]
-        else:
-            before = remaining[:pipe]
-            if before:
-                rows[-1][-1].append(Text(before, text_node.span))
-            rows[-1].append([])
-            remaining = remaining[pipe + 1 :]
+        row = rows[-1]
+        chunks = line.split("|")
+        last_chunk = len(chunks) - 1
+        for j, chunk in enumerate(chunks):
+            if j:
+                row.append([])
+            if (i or j) and (j < last_chunk or i < last_line):
+                chunk = chunk.strip()
+            if chunk:
+                row[-1].append(Text(chunk, span))
 
 
 def _trim_cell(cell: list[Text | Escape | MacroCall]) -> None:
     """Strip leading/trailing whitespace from Text nodes at cell boundaries."""
-    # Trim leading
-    while cell and isinstance(cell[0], Text):
-        stripped = cell[0].value.lstrip()
+    # Trim leading: skip whitespace-only Text nodes, then drop them in one slice
+    lead = 0
+    while lead < len(cell):
+        node = cell[lead]
+        if type(node) is not Text:
+            break
+        stripped = node.value.lstrip()
         if stripped:
-            cell[0] = Text(stripped, cell[0].span)
+            if len(stripped) != len(node.value):
+                cell[lead] = Text(stripped, node.span)
             break
-        else:
-            cell.pop(0)
-    # Trim trailing
-    while cell and isinstance(cell[-1], Text):
+        lead += 1
+    if lead:
+        del cell[:lead]
+    # Trim trailing (pop() from the end is already O(1))
+    while cell and type(cell[-1]) is Text:
         stripped = cell[-1].value.rstrip()
         if stripped:
-            cell[-1] = Text(stripped, cell[-1].span)
+            if len(stripped) != len(cell[-1].value):
+                cell[-1] = Text(stripped, cell[-1].span)
             break
-        else:
-            cell.pop()
+        cell.pop()
+
+
+# ---------------------------------------------------------------------------
+# Expansion-time builtin dispatch
+# ---------------------------------------------------------------------------
+
+_EXPANSION_HANDLERS: dict[
+    str, Callable[[MacroCall, EvalContext], list[MacroCall | Text | Escape]]
+] = {
+    "comment": _expand_comment,
+    "set": _expand_set,
+    "ifeq": _expand_ifeq,
+    "ifne": _expand_ifne,
+    "ifset": _expand_ifset,
+    "include": _expand_include,
+    "table": _expand_table,
+}
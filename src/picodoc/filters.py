@@ -3,8 +3,11 @@
 from __future__ import annotations
 
 import json
+import os
+import queue
 import shutil
 import subprocess
+import threading
 from dataclasses import dataclass, field
 from pathlib import Path
 
@@ -19,7 +22,10 @@ class FilterRegistry:
     document_dir: Path
     extra_paths: list[Path] = field(default_factory=list)
     timeout: float = 5.0
+    # Filters that speak the persistent line protocol (see _PersistentFilter)
+    persistent: frozenset[str] = frozenset()
     _cache: dict[str, Path | None] = field(default_factory=dict, init=False)
+    _processes: dict[str, _PersistentFilter] = field(default_factory=dict, init=False)
 
     def find_filter(self, name: str) -> Path | None:
         """Look up a filter executable by name. Results are cached."""
@@ -65,12 +71,16 @@ class FilterRegistry:
 
         json_input = json.dumps(payload)
 
+        if name in self.persistent:
+            return self._invoke_persistent(name, filter_path, json_input, span)
+
+        # Exchange bytes: the payload is ASCII (json.dumps escapes non-ASCII),
+        # and output is decoded as UTF-8 regardless of the locale
         try:
             result = subprocess.run(
                 [str(filter_path)],
-                input=json_input,
+                input=json_input.encode("ascii"),
                 capture_output=True,
-                text=True,
                 timeout=self.timeout,
             )
         except subprocess.TimeoutExpired:
@@ -79,19 +89,153 @@ class FilterRegistry:
                 span,
                 "",
             ) from None
+        except OSError as exc:
+            raise EvalError(f"filter '{name}' could not be started: {exc}", span, "") from None
 
         if result.returncode != 0:
-            stderr = result.stderr.strip()
+            stderr = result.stderr.decode("utf-8", errors="replace").strip()
             msg = f"filter '{name}' failed (exit {result.returncode})"
             if stderr:
                 msg += f": {stderr}"
             raise EvalError(msg, span, "")
 
-        return result.stdout
+        try:
+            return result.stdout.decode("utf-8")
+        except UnicodeDecodeError:
+            raise EvalError(f"filter '{name}' output is not valid UTF-8", span, "") from None
+
+    def _invoke_persistent(
+        self,
+        name: str,
+        filter_path: Path,
+        json_input: str,
+        span: Span,
+    ) -> str:
+        """Send one request to a persistent filter, starting it on first use."""
+        process = self._processes.get(name)
+        if process is None:
+            try:
+                process = _PersistentFilter(filter_path)
+            except OSError as exc:
+                raise EvalError(f"filter '{name}' could not be started: {exc}", span, "") from None
+            self._processes[name] = process
+
+        try:
+            line = process.request(json_input, self.timeout)
+        except queue.Empty:
+            process = self._processes.pop(name)
+            process.proc.kill()
+            process.close()
+            raise EvalError(
+                f"filter '{name}' timed out after {self.timeout}s",
+                span,
+                "",
+            ) from None
+
+        if not line:
+            process = self._processes.pop(name)
+            process.close()
+            msg = f"filter '{name}' exited unexpectedly"
+            stderr = process.stderr_text()
+            if stderr:
+                msg += f": {stderr}"
+            raise EvalError(msg, span, "")
+
+        try:
+            response = json.loads(line.decode("utf-8"))
+        except UnicodeDecodeError:
+            raise EvalError(f"filter '{name}' output is not valid UTF-8", span, "") from None
+        except json.JSONDecodeError:
+            response = None
+        if isinstance(response, dict):
+            error = response.get("error")
+            if isinstance(error, str):
+                raise EvalError(f"filter '{name}' failed: {error}", span, "")
+            output = response.get("output")
+            if isinstance(output, str):
+                return output
+        raise EvalError(f"filter '{name}' sent an invalid response", span, "")
+
+    def close(self) -> None:
+        """Shut down any persistent filter processes started by this registry."""
+        while self._processes:
+            _, process = self._processes.popitem()
+            process.close()
+
+    def __enter__(self) -> FilterRegistry:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+class _PersistentFilter:
+    """A filter process kept alive across invocations.
+
+    Requests are single-line JSON payloads (as for one-shot filters) written
+    to stdin; each is answered by one JSON line on stdout holding either
+    {"output": markup} or {"error": message}. The process exits on stdin EOF.
+    """
+
+    def __init__(self, path: Path) -> None:
+        # Raw bytes throughout, as for one-shot filters: the reader threads
+        # never decode, so bad output cannot kill them
+        self.proc = subprocess.Popen(
+            [str(path)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        # Both pipes are drained by threads so requests can time out portably
+        # and a chatty stderr cannot fill its pipe and stall the filter
+        self.lines: queue.Queue[bytes] = queue.Queue()
+        self._stderr: list[bytes] = []
+        self._stderr_reader = threading.Thread(target=self._read_stderr, daemon=True)
+        self._stderr_reader.start()
+        threading.Thread(target=self._read_lines, daemon=True).start()
+
+    def _read_lines(self) -> None:
+        assert self.proc.stdout is not None
+        for line in self.proc.stdout:
+            self.lines.put(line)
+        self.lines.put(b"")  # EOF
+
+    def _read_stderr(self) -> None:
+        assert self.proc.stderr is not None
+        for line in self.proc.stderr:
+            self._stderr.append(line)
+
+    def stderr_text(self) -> str:
+        """Return everything written to stderr so far (call after close())."""
+        return b"".join(self._stderr).decode("utf-8", errors="replace").strip()
+
+    def request(self, json_input: str, timeout: float) -> bytes:
+        """Send a request and return the response line (b'' if the process exited).
+
+        Raises queue.Empty if no response arrives within *timeout* seconds.
+        """
+        assert self.proc.stdin is not None
+        try:
+            self.proc.stdin.write(json_input.encode("ascii") + b"\n")
+            self.proc.stdin.flush()
+        except OSError:
+            return b""
+        return self.lines.get(timeout=timeout)
+
+    def close(self) -> None:
+        try:
+            if self.proc.stdin is not None:
+                self.proc.stdin.close()
+        except OSError:
+            pass
+        try:
+            self.proc.wait(timeout=1.0)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+            self.proc.wait()
+        self._stderr_reader.join(timeout=1.0)
 
 
 def _is_executable(path: Path) -> bool:
     """Check whether a path is an executable file."""
-    import os
-
     return os.access(path, os.X_OK)
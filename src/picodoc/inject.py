@@ -21,45 +21,28 @@ def inject_head_items(
     if not css_files and not js_files and not meta_tags:
         return doc
 
-    items: list[MacroCall] = []
+    items = (
+        *(_make_link(path) for path in css_files),
+        *(_make_script(path) for path in js_files),
+        *(_make_meta(name, content) for name, content in meta_tags),
+    )
+    # One tuple concatenation: doc.children is copied once
+    return Document(items + doc.children, doc.span)
 
-    for path in css_files:
-        items.append(
-            MacroCall(
-                "link",
-                (
-                    NamedArg("rel", Text("stylesheet", _CLI_SPAN), _CLI_SPAN, _CLI_SPAN),
-                    NamedArg("href", Text(path, _CLI_SPAN), _CLI_SPAN, _CLI_SPAN),
-                ),
-                None,
-                True,
-                _CLI_SPAN,
-            )
-        )
 
-    for path in js_files:
-        items.append(
-            MacroCall(
-                "script",
-                (NamedArg("src", Text(path, _CLI_SPAN), _CLI_SPAN, _CLI_SPAN),),
-                None,
-                True,
-                _CLI_SPAN,
-            )
-        )
+def _cli_arg(name: str, value: str) -> NamedArg:
+    return NamedArg(name, Text(value, _CLI_SPAN), _CLI_SPAN, _CLI_SPAN)
 
-    for name, content in meta_tags:
-        items.append(
-            MacroCall(
-                "meta",
-                (
-                    NamedArg("name", Text(name, _CLI_SPAN), _CLI_SPAN, _CLI_SPAN),
-                    NamedArg("content", Text(content, _CLI_SPAN), _CLI_SPAN, _CLI_SPAN),
-                ),
-                None,
-                True,
-                _CLI_SPAN,
-            )
-        )
 
-    return Document((*items, *doc.children), doc.span)
+def _make_link(path: str) -> MacroCall:
+    args = (_cli_arg("rel", "stylesheet"), _cli_arg("href", path))
+    return MacroCall("link", args, None, True, _CLI_SPAN)
+
+
+def _make_script(path: str) -> MacroCall:
+    return MacroCall("script", (_cli_arg("src", path),), None, True, _CLI_SPAN)
+
+
+def _make_meta(name: str, content: str) -> MacroCall:
+    args = (_cli_arg("name", name), _cli_arg("content", content))
+    return MacroCall("meta", args, None, True, _CLI_SPAN)
@@ -2,11 +2,37 @@
 
 from __future__ import annotations
 
+import re
 from enum import Enum, auto
+from typing import TYPE_CHECKING
 
 from picodoc.errors import LexError
 from picodoc.strings import strip_string_whitespace
-from picodoc.tokens import Position, Span, Token, TokenType, is_hex_digit, is_ident_char
+from picodoc.tokens import Position, Span, Token, TokenType, is_ident_char
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+# Run patterns for the normal-mode scanners. \w is a superset of what
+# is_ident_char accepts (it also matches numeric characters such as "½"), so
+# the scanners below re-check non-ASCII runs against is_ident_char.
+_WS_RUN = re.compile(r"[ \t]+").match
+_IDENT_RUN = re.compile(r"[\w.!$%&*+\-/@^~]+").match
+_TEXT_RUN = re.compile(r'[^#\[\]\\:=?" \t\n\r\0\w.!$%&*+\-/@^~]*').match
+
+# Identifier characters precomputed for the ASCII range; non-ASCII characters
+# fall back to is_ident_char.
+_ASCII_IDENT = frozenset(ch for ch in map(chr, range(128)) if is_ident_char(ch))
+
+# Characters that end a text run: delimiters, whitespace, NUL and any ASCII
+# identifier character
+_TEXT_STOP = frozenset('#[]\\:=?" \t\n\r\0') | _ASCII_IDENT
+
+# Hex digits of a \x or \U escape, matched within the fixed-width window
+_HEX_RUN = re.compile(r"[0-9A-Fa-f]*").match
+
+# Literal text inside an interpreted string runs to the next quote or escape
+_STRING_TEXT_RUN = re.compile(r'[^"\\]+').match
 
 
 class _State(Enum):
@@ -19,27 +45,53 @@ class _State(Enum):
 class Lexer:
     """Tokenize PicoDoc source text into a stream of Token objects."""
 
+    __slots__ = (
+        "_append",
+        "_bracket_depth",
+        "_col",
+        "_filename",
+        "_line",
+        "_n",
+        "_pos",
+        "_source",
+        "_state",
+        "_state_stack",
+        "_tokens",
+    )
+
     def __init__(self, source: str, filename: str = "input.pdoc") -> None:
         self._source = source
+        self._n = len(source)
         self._filename = filename
         self._pos = 0
         self._line = 1
         self._col = 1
         self._tokens: list[Token] = []
+        self._append = self._tokens.append
         self._state_stack: list[tuple[_State, int]] = []  # (state, bracket_depth)
         self._state = _State.NORMAL
         self._bracket_depth = 0
 
     def tokenize(self) -> list[Token]:
         """Tokenize the full source and return the token list."""
-        while self._pos < len(self._source):
-            if self._state == _State.NORMAL:
-                self._lex_normal()
-            elif self._state == _State.INTERP_STRING:
+        source = self._source
+        n = self._n
+        normal = _State.NORMAL
+        lex_normal = self._lex_normal
+        while self._pos < n:
+            state = self._state
+            if state is normal:
+                # Stay in a tight loop for the common case; only a string
+                # opening leaves normal mode
+                while True:
+                    lex_normal(source[self._pos])
+                    if self._pos >= n or self._state is not normal:
+                        break
+            elif state is _State.INTERP_STRING:
                 self._lex_interp_string()
-            elif self._state == _State.CODE_MODE:
-                self._lex_code_mode()
-            elif self._state == _State.RAW_STRING:
+            elif state is _State.CODE_MODE:
+                self._lex_code_mode(source[self._pos])
+            elif state is _State.RAW_STRING:
                 # Raw string is handled inline when entering the state;
                 # this branch should not be reached.
                 raise self._error("internal error: unexpected RAW_STRING state")
@@ -62,7 +114,7 @@ class Lexer:
 
     def _peek(self, offset: int = 0) -> str:
         idx = self._pos + offset
-        if idx < len(self._source):
+        if idx < self._n:
             return self._source[idx]
         return ""
 
@@ -76,12 +128,24 @@ class Lexer:
             self._col += 1
         return ch
 
+    def _skip_to(self, end: int) -> None:
+        """Advance to offset end, updating line and column for the skipped text."""
+        source = self._source
+        pos = self._pos
+        newlines = source.count("\n", pos, end)
+        if newlines:
+            self._line += newlines
+            self._col = end - source.rfind("\n", pos, end)
+        else:
+            self._col += end - pos
+        self._pos = end
+
     def _emit(self, tt: TokenType, value: str, raw: str, start: Position | None = None) -> Token:
         end = self._current_pos()
         if start is None:
             start = end
         tok = Token(tt, value, raw, Span(start, end))
-        self._tokens.append(tok)
+        self._append(tok)
         return tok
 
     def _error(self, message: str, pos: Position | None = None) -> LexError:
@@ -105,107 +169,105 @@ class Lexer:
     # Normal mode
     # ------------------------------------------------------------------
 
-    def _lex_normal(self) -> None:
-        ch = self._peek()
-
-        if ch == "\0":
-            raise self._error("NUL character in source")
-
-        if ch == "#":
-            start = self._current_pos()
-            self._advance()
-            self._emit(TokenType.HASH, "#", "#", start)
-            return
-
-        if ch == "[":
-            start = self._current_pos()
-            self._advance()
-            self._emit(TokenType.LBRACKET, "[", "[", start)
-            return
-
-        if ch == "]":
-            start = self._current_pos()
-            self._advance()
-            self._emit(TokenType.RBRACKET, "]", "]", start)
-            return
-
-        if ch == ":":
-            start = self._current_pos()
-            self._advance()
-            self._emit(TokenType.COLON, ":", ":", start)
-            return
-
-        if ch == "=":
-            start = self._current_pos()
-            self._advance()
-            self._emit(TokenType.EQUALS, "=", "=", start)
+    def _lex_normal(self, ch: str) -> None:
+        """Lex one token starting with ch, the character at the current position."""
+        tt = _SINGLE_CHAR_TOKENS.get(ch)
+        if tt is not None:
+            self._emit_single(tt, ch)
             return
 
-        if ch == "?":
-            start = self._current_pos()
-            self._advance()
-            self._emit(TokenType.QUESTION, "?", "?", start)
+        handler = _NORMAL_DISPATCH.get(ch)
+        if handler is not None:
+            handler(self)
             return
 
-        if ch == "\\":
-            self._lex_prose_escape()
+        if ch in _ASCII_IDENT or (not ch.isascii() and is_ident_char(ch)):
+            self._lex_identifier()
             return
 
-        if ch == '"':
-            self._lex_string_open()
-            return
+        # Anything else is TEXT
+        self._lex_text()
 
-        if ch == "\n":
-            start = self._current_pos()
-            self._advance()
-            self._emit(TokenType.NEWLINE, "\n", "\n", start)
-            return
+    def _lex_nul(self) -> None:
+        raise self._error("NUL character in source")
 
-        if ch == "\r" and self._peek(1) == "\n":
-            start = self._current_pos()
+    def _lex_cr(self) -> None:
+        start = self._current_pos()
+        if self._peek(1) == "\n":
             self._advance()
             self._advance()
             self._emit(TokenType.NEWLINE, "\n", "\r\n", start)
             return
+        # A lone CR (not part of CRLF) is kept as text
+        self._advance()
+        self._emit(TokenType.TEXT, "\r", "\r", start)
 
-        if ch in " \t":
-            self._lex_ws()
-            return
-
-        if is_ident_char(ch):
-            self._lex_identifier()
-            return
-
-        # Anything else is TEXT
-        self._lex_text()
+    # Run scanners: match the whole run with a regex, then slice it out of the
+    # source in one go. None of these runs contain a newline, so only the
+    # column moves.
 
     def _lex_ws(self) -> None:
-        start = self._current_pos()
-        raw = []
-        while self._pos < len(self._source) and self._peek() in " \t":
-            raw.append(self._advance())
-        text = "".join(raw)
-        self._emit(TokenType.WS, text, text, start)
+        begin = self._pos
+        m = _WS_RUN(self._source, begin)
+        assert m is not None
+        self._emit_run(TokenType.WS, begin, m.end())
 
     def _lex_identifier(self) -> None:
-        start = self._current_pos()
-        chars = []
-        while self._pos < len(self._source) and is_ident_char(self._peek()):
-            chars.append(self._advance())
-        text = "".join(chars)
-        self._emit(TokenType.IDENTIFIER, text, text, start)
+        source = self._source
+        begin = self._pos
+        m = _IDENT_RUN(source, begin)
+        assert m is not None
+        end = m.end()
+        run = m.group()
+        if not run.isascii():
+            for i, ch in enumerate(run):
+                if not is_ident_char(ch):
+                    end = begin + i
+                    break
+        self._emit_run(TokenType.IDENTIFIER, begin, end)
 
     def _lex_text(self) -> None:
-        start = self._current_pos()
-        chars = []
-        while self._pos < len(self._source):
-            ch = self._peek()
-            if ch in '#[]\\:=?"' or ch in " \t\n\r" or ch == "\0" or is_ident_char(ch):
-                break
-            chars.append(self._advance())
-        if chars:
-            text = "".join(chars)
-            self._emit(TokenType.TEXT, text, text, start)
+        source = self._source
+        n = self._n
+        begin = end = self._pos
+        while True:
+            m = _TEXT_RUN(source, end)
+            assert m is not None
+            end = m.end()
+            # A \w character that is not an identifier character is text
+            if end < n and source[end] not in _TEXT_STOP and not is_ident_char(source[end]):
+                end += 1
+                continue
+            break
+        if end > begin:
+            self._emit_run(TokenType.TEXT, begin, end)
+
+    def _emit_single(self, tt: TokenType, ch: str) -> None:
+        """Emit the one-character token ch at the current position and advance past it."""
+        line = self._line
+        col = self._col
+        pos = self._pos
+        start = Position(line, col, pos)
+        self._pos = pos + 1
+        if ch == "\n":
+            end = Position(line + 1, 1, pos + 1)
+            self._line = line + 1
+            self._col = 1
+        else:
+            end = Position(line, col + 1, pos + 1)
+            self._col = col + 1
+        self._append(Token(tt, ch, ch, Span(start, end)))
+
+    def _emit_run(self, tt: TokenType, begin: int, end: int) -> None:
+        """Emit source[begin:end] (no newlines) as one token and advance past it."""
+        line = self._line
+        col = self._col
+        end_col = col + end - begin
+        span = Span(Position(line, col, begin), Position(line, end_col, end))
+        self._pos = end
+        self._col = end_col
+        text = self._source[begin:end]
+        self._append(Token(tt, text, text, span))
 
     # ------------------------------------------------------------------
     # Prose escapes
@@ -215,7 +277,7 @@ class Lexer:
         start = self._current_pos()
         self._advance()  # consume backslash
 
-        if self._pos >= len(self._source):
+        if self._pos >= self._n:
             raise self._error("unexpected end of input after '\\'", start)
 
         ch = self._peek()
@@ -241,18 +303,24 @@ class Lexer:
 
     def _lex_hex_escape(self, count: int, start: Position) -> tuple[str, str]:
         """Read `count` hex digits and return (resolved char, raw text)."""
-        digits = []
-        prefix = self._source[start.offset : self._pos]  # e.g. "\\x" or "\\U"
-        for i in range(count):
-            if self._pos >= len(self._source):
+        source = self._source
+        pos = self._pos
+        prefix = source[start.offset : pos]  # e.g. "\\x" or "\\U"
+        end = pos + count
+        m = _HEX_RUN(source, pos, end)
+        assert m is not None
+        digits_end = m.end()
+        if digits_end < end:
+            if digits_end >= self._n:
                 raise self._error(
-                    f"incomplete escape: expected {count} hex digits, got {i}", start
+                    f"incomplete escape: expected {count} hex digits, got {digits_end - pos}",
+                    start,
                 )
-            ch = self._peek()
-            if not is_hex_digit(ch):
-                raise self._error(f"invalid hex digit '{ch}' in escape sequence", start)
-            digits.append(self._advance())
-        hex_str = "".join(digits)
+            ch = source[digits_end]
+            raise self._error(f"invalid hex digit '{ch}' in escape sequence", start)
+        self._pos = end
+        self._col += count
+        hex_str = source[pos:end]
         codepoint = int(hex_str, 16)
         if codepoint > 0x10FFFF:
             raise self._error(f"Unicode codepoint U+{hex_str} is out of range", start)
@@ -265,10 +333,14 @@ class Lexer:
 
     def _lex_string_open(self) -> None:
         start = self._current_pos()
-        quote_count = 0
-        while self._pos < len(self._source) and self._peek() == '"':
-            self._advance()
-            quote_count += 1
+        source = self._source
+        n = self._n
+        run_end = self._pos
+        while run_end < n and source[run_end] == '"':
+            run_end += 1
+        quote_count = run_end - self._pos
+        self._pos = run_end
+        self._col += quote_count
 
         if quote_count == 1:
             # Interpreted string
@@ -295,9 +367,7 @@ class Lexer:
 
         if ch == '"':
             # End of interpreted string
-            s = self._current_pos()
-            self._advance()
-            self._emit(TokenType.STRING_END, '"', '"', s)
+            self._emit_single(TokenType.STRING_END, '"')
             self._pop_state()
             return
 
@@ -305,18 +375,13 @@ class Lexer:
             self._lex_string_escape()
             return
 
-        # Accumulate STRING_TEXT
-        chars = []
-        text_start = self._current_pos()
-        while self._pos < len(self._source):
-            c = self._peek()
-            if c in '"\\':
-                break
-            chars.append(self._advance())
-        if chars:
-            text = "".join(chars)
-            self._emit(TokenType.STRING_TEXT, text, text, text_start)
-        elif self._pos >= len(self._source):
+        # Everything up to the next quote or backslash is STRING_TEXT
+        m = _STRING_TEXT_RUN(self._source, self._pos)
+        if m is not None:
+            self._skip_to(m.end())
+            text = m.group()
+            self._emit(TokenType.STRING_TEXT, text, text, start)
+        elif self._pos >= self._n:
             raise self._error("unterminated interpreted string", start)
 
     # ------------------------------------------------------------------
@@ -327,7 +392,7 @@ class Lexer:
         start = self._current_pos()
         self._advance()  # consume backslash
 
-        if self._pos >= len(self._source):
+        if self._pos >= self._n:
             raise self._error("unexpected end of input in string escape", start)
 
         ch = self._peek()
@@ -363,29 +428,24 @@ class Lexer:
     # Code mode (inside \[...] within an interpreted string)
     # ------------------------------------------------------------------
 
-    def _lex_code_mode(self) -> None:
-        ch = self._peek()
+    def _lex_code_mode(self, ch: str) -> None:
 
         if ch == "[":
-            start = self._current_pos()
-            self._advance()
             self._bracket_depth += 1
-            self._emit(TokenType.LBRACKET, "[", "[", start)
+            self._emit_single(TokenType.LBRACKET, "[")
             return
 
         if ch == "]":
-            start = self._current_pos()
-            self._advance()
             self._bracket_depth -= 1
             if self._bracket_depth == 0:
-                self._emit(TokenType.CODE_CLOSE, "]", "]", start)
+                self._emit_single(TokenType.CODE_CLOSE, "]")
                 self._pop_state()
             else:
-                self._emit(TokenType.RBRACKET, "]", "]", start)
+                self._emit_single(TokenType.RBRACKET, "]")
             return
 
         # Everything else dispatches like Normal mode (including nested strings)
-        self._lex_normal()
+        self._lex_normal(ch)
 
     # ------------------------------------------------------------------
     # Raw strings
@@ -393,32 +453,57 @@ class Lexer:
 
     def _lex_raw_string(self, delimiter_count: int, start: Position) -> None:
         """Scan for the closing delimiter (delimiter_count quotes) and emit RAW_STRING."""
-        content_start = self._pos
-
-        while self._pos < len(self._source):
-            if self._peek() == '"':
-                # Count consecutive quotes
-                run_start = self._pos
-                run_count = 0
-                while self._pos < len(self._source) and self._peek() == '"':
-                    self._advance()
-                    run_count += 1
-                if run_count == delimiter_count:
-                    # Found closing delimiter
-                    raw_content = self._source[content_start:run_start]
-                    stripped = strip_string_whitespace(raw_content)
-                    raw_text = self._source[start.offset : self._pos]
-                    self._emit(TokenType.RAW_STRING, stripped, raw_text, start)
-                    return
-                # Not enough quotes — they become part of content, continue scanning
-            else:
-                self._advance()
-
+        source = self._source
+        n = self._n
+        content_start = pos = self._pos
+
+        # Jump from quote run to quote run; everything in between is content
+        while True:
+            run_start = source.find('"', pos)
+            if run_start < 0:
+                break
+            pos = run_start + 1
+            while pos < n and source[pos] == '"':
+                pos += 1
+            if pos - run_start == delimiter_count:
+                # Found closing delimiter
+                self._skip_to(pos)
+                raw_content = source[content_start:run_start]
+                stripped = strip_string_whitespace(raw_content)
+                raw_text = source[start.offset : pos]
+                self._emit(TokenType.RAW_STRING, stripped, raw_text, start)
+                return
+            # Wrong number of quotes — they become part of content, continue scanning
+
+        self._skip_to(n)
         raise self._error(
             f"unterminated raw string (expected {delimiter_count} closing quotes)", start
         )
 
 
+# Normal-mode dispatch: characters that always form a one-character token,
+# then characters with a dedicated handler. Anything else is an identifier
+# or text run.
+_SINGLE_CHAR_TOKENS: dict[str, TokenType] = {
+    "#": TokenType.HASH,
+    "[": TokenType.LBRACKET,
+    "]": TokenType.RBRACKET,
+    ":": TokenType.COLON,
+    "=": TokenType.EQUALS,
+    "?": TokenType.QUESTION,
+    "\n": TokenType.NEWLINE,
+}
+
+_NORMAL_DISPATCH: dict[str, Callable[[Lexer], None]] = {
+    "\0": Lexer._lex_nul,
+    "\\": Lexer._lex_prose_escape,
+    '"': Lexer._lex_string_open,
+    "\r": Lexer._lex_cr,
+    " ": Lexer._lex_ws,
+    "\t": Lexer._lex_ws,
+}
+
+
 def tokenize(source: str, filename: str = "input.pdoc") -> list[Token]:
     """Convenience function: tokenize source text and return token list."""
     return Lexer(source, filename).tokenize()
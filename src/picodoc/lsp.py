@@ -2,28 +2,78 @@
 
 from __future__ import annotations
 
+import asyncio
+from typing import TYPE_CHECKING, Any
+
 from lsprotocol.types import (
     TEXT_DOCUMENT_DID_CHANGE,
+    TEXT_DOCUMENT_DID_CLOSE,
     TEXT_DOCUMENT_DID_OPEN,
     Diagnostic,
     DiagnosticSeverity,
     DidChangeTextDocumentParams,
+    DidCloseTextDocumentParams,
     DidOpenTextDocumentParams,
     Position,
     PublishDiagnosticsParams,
     Range,
     TextDocumentSyncKind,
 )
+from pygls.exceptions import FeatureNotificationError
 from pygls.lsp.server import LanguageServer
 
 from picodoc.errors import EvalError, LexError, ParseError
 from picodoc.eval import evaluate
 from picodoc.parser import parse
 
-server = LanguageServer("picodoc-lsp", "0.1.0", text_document_sync_kind=TextDocumentSyncKind.Full)
+if TYPE_CHECKING:
+    from picodoc.tokens import Position as SourcePosition
+    from picodoc.tokens import Span
+
+_SOURCE = "picodoc"
+
+# Edits are validated once typing pauses for this long
+_DEBOUNCE_SECONDS = 0.15
+
+
+class PicoDocLanguageServer(LanguageServer):
+    """Language server holding per-document validation state."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        # Per-URI pending validation timers and the last source that was validated
+        self.pending: dict[str, asyncio.TimerHandle] = {}
+        self.validated: dict[str, str] = {}
+
 
+server = PicoDocLanguageServer(
+    "picodoc-lsp", "0.1.0", text_document_sync_kind=TextDocumentSyncKind.Full
+)
+
+
+def _point_range(pos: SourcePosition) -> Range:
+    """One-character LSP range at a 1-based source position."""
+    line = pos.line - 1
+    col = pos.column - 1
+    return Range(
+        start=Position(line=line, character=col),
+        end=Position(line=line, character=col + 1),
+    )
+
+
+def _span_range(span: Span) -> Range:
+    """LSP range (0-based) covering a 1-based source span."""
+    return Range(
+        start=Position(line=span.start.line - 1, character=span.start.column - 1),
+        end=Position(line=span.end.line - 1, character=span.end.column - 1),
+    )
 
-def _validate(ls: LanguageServer, uri: str) -> None:
+
+def _diagnostic(rng: Range, message: str, severity: DiagnosticSeverity) -> Diagnostic:
+    return Diagnostic(range=rng, message=message, severity=severity, source=_SOURCE)
+
+
+def _validate(ls: PicoDocLanguageServer, uri: str) -> None:
     """Run the PicoDoc pipeline and publish diagnostics."""
     doc = ls.workspace.get_text_document(uri)
     source = doc.source
@@ -33,72 +83,67 @@ def _validate(ls: LanguageServer, uri: str) -> None:
     try:
         ast = parse(source, filename)
     except LexError as exc:
-        line = exc.position.line - 1
-        col = exc.position.column - 1
         diagnostics.append(
-            Diagnostic(
-                range=Range(
-                    start=Position(line=line, character=col),
-                    end=Position(line=line, character=col + 1),
-                ),
-                message=exc.message,
-                severity=DiagnosticSeverity.Error,
-                source="picodoc",
-            )
+            _diagnostic(_point_range(exc.position), exc.message, DiagnosticSeverity.Error)
         )
     except ParseError as exc:
-        start_line = exc.span.start.line - 1
-        start_col = exc.span.start.column - 1
-        end_line = exc.span.end.line - 1
-        end_col = exc.span.end.column - 1
         diagnostics.append(
-            Diagnostic(
-                range=Range(
-                    start=Position(line=start_line, character=start_col),
-                    end=Position(line=end_line, character=end_col),
-                ),
-                message=exc.message,
-                severity=DiagnosticSeverity.Error,
-                source="picodoc",
-            )
+            _diagnostic(_span_range(exc.span), exc.message, DiagnosticSeverity.Error)
         )
     else:
         try:
             evaluate(ast, filename)
         except EvalError as exc:
-            start_line = exc.span.start.line - 1
-            start_col = exc.span.start.column - 1
-            end_line = exc.span.end.line - 1
-            end_col = exc.span.end.column - 1
             message = exc.message
             if exc.call_stack:
                 chain = " -> ".join(f"#{name}" for name in exc.call_stack)
                 message += f" (in expansion: {chain})"
             diagnostics.append(
-                Diagnostic(
-                    range=Range(
-                        start=Position(line=start_line, character=start_col),
-                        end=Position(line=end_line, character=end_col),
-                    ),
-                    message=message,
-                    severity=DiagnosticSeverity.Warning,
-                    source="picodoc",
-                )
+                _diagnostic(_span_range(exc.span), message, DiagnosticSeverity.Warning)
             )
 
     ls.text_document_publish_diagnostics(
         PublishDiagnosticsParams(uri=uri, diagnostics=diagnostics)
     )
+    ls.validated[uri] = source
+
+
+def _validate_if_changed(ls: PicoDocLanguageServer, uri: str) -> None:
+    """Validate uri unless its source matches what was last validated."""
+    ls.pending.pop(uri, None)
+    # Runs from a timer, outside pygls's handler error reporting
+    try:
+        if ls.validated.get(uri) == ls.workspace.get_text_document(uri).source:
+            return
+        _validate(ls, uri)
+    except Exception as exc:
+        ls.report_server_error(exc, FeatureNotificationError)
+
+
+def _cancel_pending(ls: PicoDocLanguageServer, uri: str) -> None:
+    handle = ls.pending.pop(uri, None)
+    if handle is not None:
+        handle.cancel()
 
 
 @server.feature(TEXT_DOCUMENT_DID_OPEN)
-def did_open(ls: LanguageServer, params: DidOpenTextDocumentParams) -> None:
+def did_open(ls: PicoDocLanguageServer, params: DidOpenTextDocumentParams) -> None:
     _validate(ls, params.text_document.uri)
 
 
 @server.feature(TEXT_DOCUMENT_DID_CHANGE)
-def did_change(ls: LanguageServer, params: DidChangeTextDocumentParams) -> None:
-    _validate(ls, params.text_document.uri)
+def did_change(ls: PicoDocLanguageServer, params: DidChangeTextDocumentParams) -> None:
+    uri = params.text_document.uri
+    _cancel_pending(ls, uri)
+    loop = asyncio.get_running_loop()
+    ls.pending[uri] = loop.call_later(_DEBOUNCE_SECONDS, _validate_if_changed, ls, uri)
+
+
+@server.feature(TEXT_DOCUMENT_DID_CLOSE)
+def did_close(ls: PicoDocLanguageServer, params: DidCloseTextDocumentParams) -> None:
+    uri = params.text_document.uri
+    _cancel_pending(ls, uri)
+    ls.validated.pop(uri, None)
 
 
 def main() -> None:
@@ -2,6 +2,10 @@
 
 from __future__ import annotations
 
+from functools import lru_cache
+from sys import intern
+from typing import TYPE_CHECKING
+
 from picodoc.ast import (
     Body,
     CodeSection,
@@ -19,12 +23,21 @@ from picodoc.errors import ParseError
 from picodoc.lexer import tokenize
 from picodoc.tokens import Position, Span, Token, TokenType
 
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
 
 class Parser:
-    """Recursive descent parser for PicoDoc token streams."""
+    """Recursive descent parser for PicoDoc token streams.
+
+    Macro and argument names are interned so the evaluator's name
+    comparisons and definition lookups hit the identity fast path.
+    """
 
     def __init__(self, tokens: list[Token], source: str, filename: str) -> None:
         self._tokens = tokens
+        # Token types in a parallel list, for the lookahead predicates
+        self._types = [tok.type for tok in tokens]
         self._source = source
         self._filename = filename
         self._pos = 0
@@ -41,10 +54,10 @@ class Parser:
         return self._tokens[-1]  # EOF
 
     def _at(self, *types: TokenType) -> bool:
-        return self._peek().type in types
+        return self._types[self._pos] in types
 
     def _at_eof(self) -> bool:
-        return self._peek().type == TokenType.EOF
+        return self._types[self._pos] is TokenType.EOF
 
     def _advance(self) -> Token:
         tok = self._tokens[self._pos]
@@ -91,9 +104,7 @@ class Parser:
         return Document(tuple(children), Span(start, end))
 
     def _parse_block(self) -> MacroCall | Paragraph | None:
-        # Skip blank lines
-        while not self._at_eof() and self._is_blank_line():
-            self._skip_blank_line()
+        self._skip_blank_lines()
 
         if self._at_eof():
             return None
@@ -126,8 +137,7 @@ class Parser:
         start = self._peek().span.start
 
         while not self._at_eof() and not self._is_blank_line() and not self._at_block_start():
-            line = self._parse_inline_content(_STOP_NEWLINE_EOF)
-            children.extend(line)
+            children.extend(self._parse_inline_content(_STOP_NEWLINE_EOF))
 
             if self._at(TokenType.NEWLINE):
                 nl_tok = self._advance()
@@ -135,7 +145,7 @@ class Parser:
                 if not self._at_eof() and not self._is_blank_line() and not self._at_block_start():
                     children.append(Text("\n", nl_tok.span))
 
-        children = _coalesce_text(children)
+        children = _join_lines(children)
         end = children[-1].span.end if children else start
         return Paragraph(tuple(children), Span(start, end))
 
@@ -148,7 +158,7 @@ class Parser:
         self._advance()  # consume HASH
 
         name_tok = self._expect(TokenType.IDENTIFIER, "expected macro name after '#'")
-        name = name_tok.value
+        name = intern(name_tok.value)
 
         args: tuple[NamedArg, ...] = ()
         body: Body | InterpString | RawString | None = None
@@ -187,7 +197,7 @@ class Parser:
         self._expect(TokenType.HASH, "expected '#' after '['")
 
         name_tok = self._expect(TokenType.IDENTIFIER, "expected macro name after '#'")
-        name = name_tok.value
+        name = intern(name_tok.value)
 
         self._bracket_depth += 1
 
@@ -228,7 +238,9 @@ class Parser:
     # ------------------------------------------------------------------
 
     def _is_named_arg_start(self) -> bool:
-        return self._at(TokenType.IDENTIFIER) and self._peek(1).type == TokenType.EQUALS
+        types = self._types
+        pos = self._pos
+        return types[pos] is TokenType.IDENTIFIER and types[pos + 1] is TokenType.EQUALS
 
     def _parse_named_args(self) -> list[NamedArg]:
         args = [self._parse_named_arg()]
@@ -246,38 +258,40 @@ class Parser:
         self._expect(TokenType.EQUALS, "expected '=' after argument name")
         self._skip_ws()
         value = self._parse_arg_value()
-        return NamedArg(name_tok.value, value, name_span, Span(name_span.start, value.span.end))
+        return NamedArg(
+            intern(name_tok.value), value, name_span, Span(name_span.start, value.span.end)
+        )
 
     def _parse_arg_value(self) -> Text | InterpString | RawString | MacroCall | RequiredMarker:
-        if self._at(TokenType.STRING_START):
-            return self._parse_interp_string()
-        if self._at(TokenType.RAW_STRING):
-            return self._parse_raw_string()
-        if self._at(TokenType.LBRACKET) and self._peek(1).type == TokenType.HASH:
+        tt = self._types[self._pos]
+        handler = _ARG_VALUE_PARSERS.get(tt)
+        if handler is not None:
+            return handler(self)
+        if tt is TokenType.LBRACKET and self._types[self._pos + 1] is TokenType.HASH:
             return self._parse_bracketed_call()
-        if self._at(TokenType.HASH):
-            return self._parse_macro_ref()
-        if self._at(TokenType.QUESTION):
-            tok = self._advance()
-            return RequiredMarker(tok.span)
         return self._parse_bareword()
 
+    def _parse_required_marker(self) -> RequiredMarker:
+        tok = self._advance()  # consume QUESTION
+        return RequiredMarker(tok.span)
+
     def _parse_bareword(self) -> Text:
         if not self._at(TokenType.IDENTIFIER, TokenType.TEXT):
             raise self._error("expected argument value", self._peek().span)
-        start = self._peek().span.start
-        parts: list[str] = []
+        first = self._advance()
+        # Most barewords are a single token: reuse its value and span as is
+        if not self._at(TokenType.IDENTIFIER, TokenType.TEXT):
+            return Text(first.value, first.span)
+        value = first.value
         while self._at(TokenType.IDENTIFIER, TokenType.TEXT):
-            parts.append(self._advance().value)
-        value = "".join(parts)
-        end = self._prev_end()
-        return Text(value, Span(start, end))
+            value += self._advance().value
+        return Text(value, Span(first.span.start, self._prev_end()))
 
     def _parse_macro_ref(self) -> MacroCall:
         start = self._peek().span.start
         self._advance()  # consume HASH
         name_tok = self._expect(TokenType.IDENTIFIER, "expected macro name after '#'")
-        return MacroCall(name_tok.value, (), None, False, Span(start, name_tok.span.end))
+        return MacroCall(intern(name_tok.value), (), None, False, Span(start, name_tok.span.end))
 
     # ------------------------------------------------------------------
     # Body
@@ -302,7 +316,6 @@ class Parser:
         # Inline body: content to end of line (or enclosing bracket)
         start = self._peek().span.start
         children = self._parse_inline_content(self._unbr_body_stop())
-        children = _coalesce_text(children)
         end = children[-1].span.end if children else start
         return Body(tuple(children), Span(start, end))
 
@@ -319,7 +332,6 @@ class Parser:
         # Inline content to matching ]
         start = self._peek().span.start
         children = self._parse_inline_content(_STOP_RBRACKET_EOF)
-        children = _coalesce_text(children)
         end = children[-1].span.end if children else start
         return Body(tuple(children), Span(start, end))
 
@@ -335,8 +347,7 @@ class Parser:
         start = self._peek().span.start
 
         while not self._at_eof() and not self._is_blank_line():
-            line = self._parse_inline_content(self._unbr_body_stop())
-            children.extend(line)
+            children.extend(self._parse_inline_content(self._unbr_body_stop()))
 
             if self._at(TokenType.NEWLINE):
                 nl_tok = self._advance()
@@ -347,7 +358,7 @@ class Parser:
                 # Stopped by RBRACKET or EOF — end body paragraph
                 break
 
-        children = _coalesce_text(children)
+        children = _join_lines(children)
         end = children[-1].span.end if children else start
         return Body(tuple(children), Span(start, end))
 
@@ -357,68 +368,69 @@ class Parser:
 
     def _parse_inline_content(self, stop: frozenset[TokenType]) -> list[Text | Escape | MacroCall]:
         result: list[Text | Escape | MacroCall] = []
+        # Pending text run; its span is only meaningful while text_parts is
+        # non-empty, and text_start is (re)set when the first part arrives
         text_parts: list[str] = []
-        text_start: Position | None = None
-        text_end: Position | None = None
-
-        def flush() -> None:
-            nonlocal text_start, text_end
-            if text_parts:
-                value = "".join(text_parts)
-                assert text_start is not None
-                assert text_end is not None
-                result.append(Text(value, Span(text_start, text_end)))
-                text_parts.clear()
-                text_start = None
-                text_end = None
+        tokens = self._tokens
+        text_start = text_end = tokens[self._pos].span.start
 
-        while not self._at_eof():
-            tok = self._peek()
+        # Every stop set contains EOF, so the loop never runs past the end.
+        # Tokens are read directly rather than through _peek/_advance; calls
+        # into other parse methods go through self._pos as usual.
+        while True:
+            tok = tokens[self._pos]
+            tt = tok.type
 
-            if tok.type in stop:
+            if tt in stop:
                 break
 
-            if tok.type == TokenType.HASH:
-                flush()
+            if tt in _TEXT_TOKENS:
+                if not text_parts:
+                    text_start = tok.span.start
+                text_parts.append(tok.value)
+                text_end = tok.span.end
+                self._pos += 1
+
+            elif tt is TokenType.HASH:
+                if text_parts:
+                    result.append(Text("".join(text_parts), Span(text_start, text_end)))
+                    text_parts = []
                 result.append(self._parse_unbracketed_call())
 
-            elif tok.type == TokenType.LBRACKET and self._peek(1).type == TokenType.HASH:
-                flush()
+            elif tt is TokenType.LBRACKET and tokens[self._pos + 1].type is TokenType.HASH:
+                if text_parts:
+                    result.append(Text("".join(text_parts), Span(text_start, text_end)))
+                    text_parts = []
                 result.append(self._parse_bracketed_call())
 
-            elif tok.type == TokenType.LBRACKET:
+            elif tt is TokenType.LBRACKET:
                 raise self._error("bare '[' in text \u2014 use \\[ for a literal bracket")
 
-            elif tok.type == TokenType.RBRACKET and TokenType.RBRACKET not in stop:
+            elif tt is TokenType.RBRACKET and TokenType.RBRACKET not in stop:
                 raise self._error("bare ']' in text \u2014 use \\] for a literal bracket")
 
-            elif tok.type == TokenType.ESCAPE:
-                flush()
-                t = self._advance()
-                result.append(Escape(t.value, t.span))
+            elif tt is TokenType.ESCAPE:
+                if text_parts:
+                    result.append(Text("".join(text_parts), Span(text_start, text_end)))
+                    text_parts = []
+                self._pos += 1
+                result.append(Escape(tok.value, tok.span))
 
-            elif tok.type in _TEXT_TOKENS:
-                if text_start is None:
-                    text_start = tok.span.start
-                text_parts.append(tok.value)
-                text_end = tok.span.end
-                self._advance()
-
-            elif tok.type == TokenType.NEWLINE and TokenType.NEWLINE not in stop:
+            elif tt is TokenType.NEWLINE and TokenType.NEWLINE not in stop:
                 # For bracketed body, newlines become text
-                if text_start is None:
+                if not text_parts:
                     text_start = tok.span.start
                 text_parts.append("\n")
                 text_end = tok.span.end
-                self._advance()
+                self._pos += 1
 
-            elif tok.type == TokenType.STRING_START:
+            elif tt is TokenType.STRING_START:
                 # String in body context — reconstruct as text including quotes
-                if text_start is None:
+                if not text_parts:
                     text_start = tok.span.start
                 text_parts.append('"')
                 text_end = tok.span.end
-                self._advance()
+                self._pos += 1
                 while not self._at(TokenType.STRING_END, TokenType.EOF):
                     inner = self._peek()
                     if inner.type in (TokenType.STRING_TEXT, TokenType.STRING_ESCAPE):
@@ -446,24 +458,25 @@ class Parser:
                     else:
                         break
                 if self._at(TokenType.STRING_END):
-                    if text_start is None:
+                    if not text_parts:
                         text_start = self._peek().span.start
                     text_parts.append('"')
                     text_end = self._peek().span.end
                     self._advance()
 
-            elif tok.type == TokenType.RAW_STRING:
+            elif tt is TokenType.RAW_STRING:
                 # Raw string in body context — include content as text
-                if text_start is None:
+                if not text_parts:
                     text_start = tok.span.start
                 text_parts.append(tok.value)
                 text_end = tok.span.end
-                self._advance()
+                self._pos += 1
 
             else:
                 break
 
-        flush()
+        if text_parts:
+            result.append(Text("".join(text_parts), Span(text_start, text_end)))
         return result
 
     # ------------------------------------------------------------------
@@ -475,38 +488,29 @@ class Parser:
 
         parts: list[Text | CodeSection] = []
         text_parts: list[str] = []
-        text_start: Position | None = None
-        text_end: Position | None = None
-
-        def flush() -> None:
-            nonlocal text_start, text_end
-            if text_parts:
-                value = "".join(text_parts)
-                assert text_start is not None
-                assert text_end is not None
-                parts.append(Text(value, Span(text_start, text_end)))
-                text_parts.clear()
-                text_start = None
-                text_end = None
+        text_start = text_end = start_tok.span.end
 
         while not self._at(TokenType.STRING_END, TokenType.EOF):
             tok = self._peek()
 
             if tok.type in (TokenType.STRING_TEXT, TokenType.STRING_ESCAPE):
-                if text_start is None:
+                if not text_parts:
                     text_start = tok.span.start
                 text_parts.append(tok.value)
                 text_end = tok.span.end
                 self._advance()
 
             elif tok.type == TokenType.CODE_OPEN:
-                flush()
+                if text_parts:
+                    parts.append(Text("".join(text_parts), Span(text_start, text_end)))
+                    text_parts = []
                 parts.append(self._parse_code_section())
 
             else:
                 raise self._error("unexpected token in string", tok.span)
 
-        flush()
+        if text_parts:
+            parts.append(Text("".join(text_parts), Span(text_start, text_end)))
 
         end_tok = self._expect(TokenType.STRING_END, "expected closing '\"'")
         return InterpString(tuple(parts), Span(start_tok.span.start, end_tok.span.end))
@@ -529,24 +533,38 @@ class Parser:
     # ------------------------------------------------------------------
 
     def _is_blank_line(self) -> bool:
-        if self._at(TokenType.NEWLINE):
+        types = self._types
+        tt = types[self._pos]
+        if tt is TokenType.NEWLINE:
             return True
-        if self._at(TokenType.WS):
-            next_type = self._peek(1).type
-            return next_type in (TokenType.NEWLINE, TokenType.EOF)
+        if tt is TokenType.WS:
+            next_type = types[self._pos + 1]
+            return next_type is TokenType.NEWLINE or next_type is TokenType.EOF
         return False
 
-    def _skip_blank_line(self) -> None:
-        if self._at(TokenType.WS):
-            self._advance()
-        if self._at(TokenType.NEWLINE):
-            self._advance()
+    def _skip_blank_lines(self) -> None:
+        """Skip any run of blank lines (NEWLINE, or WS before NEWLINE or EOF)."""
+        types = self._types
+        pos = self._pos
+        while True:
+            tt = types[pos]
+            if tt is TokenType.NEWLINE:
+                pos += 1
+            elif tt is TokenType.WS and types[pos + 1] is TokenType.NEWLINE:
+                pos += 2
+            elif tt is TokenType.WS and types[pos + 1] is TokenType.EOF:
+                pos += 1
+            else:
+                break
+        self._pos = pos
 
     def _at_block_start(self) -> bool:
         """Check if current position looks like the start of a block-level macro."""
-        if self._at(TokenType.HASH):
+        types = self._types
+        tt = types[self._pos]
+        if tt is TokenType.HASH:
             return True
-        return self._at(TokenType.LBRACKET) and self._peek(1).type == TokenType.HASH
+        return tt is TokenType.LBRACKET and types[self._pos + 1] is TokenType.HASH
 
     def _error(self, message: str, span: Span | None = None) -> ParseError:
         if span is None:
@@ -554,6 +572,18 @@ class Parser:
         return ParseError(message, span, self._source)
 
 
+# Argument value parsers keyed by the value's first token. A bracketed call
+# needs one token of lookahead and anything else is a bareword, so those two
+# stay in _parse_arg_value.
+_ARG_VALUE_PARSERS: dict[
+    TokenType, Callable[[Parser], InterpString | RawString | MacroCall | RequiredMarker]
+] = {
+    TokenType.STRING_START: Parser._parse_interp_string,
+    TokenType.RAW_STRING: Parser._parse_raw_string,
+    TokenType.HASH: Parser._parse_macro_ref,
+    TokenType.QUESTION: Parser._parse_required_marker,
+}
+
 # Module-level constants
 _STOP_NEWLINE_EOF: frozenset[TokenType] = frozenset({TokenType.NEWLINE, TokenType.EOF})
 _STOP_NEWLINE_RBRACKET_EOF: frozenset[TokenType] = frozenset(
@@ -573,21 +603,45 @@ _TEXT_TOKENS: frozenset[TokenType] = frozenset(
 )
 
 
-def _coalesce_text(nodes: list) -> list:
-    """Coalesce adjacent Text nodes into single nodes."""
-    if not nodes:
-        return nodes
-    result = []
+def _join_lines(nodes: list) -> list:
+    """Merge each run of adjacent Text nodes into one, joining its values once.
+
+    _parse_inline_content never returns adjacent Text nodes, so runs only form
+    where paragraph lines and their newlines are joined.
+    """
+    result: list = []
+    run: list[Text] = []
     for node in nodes:
-        if isinstance(node, Text) and result and isinstance(result[-1], Text):
-            prev = result[-1]
-            result[-1] = Text(prev.value + node.value, Span(prev.span.start, node.span.end))
-        else:
-            result.append(node)
+        if type(node) is Text:
+            run.append(node)
+            continue
+        if run:
+            result.append(_merge_run(run))
+            run = []
+        result.append(node)
+    if run:
+        result.append(_merge_run(run))
     return result
 
 
+def _merge_run(run: list[Text]) -> Text:
+    if len(run) == 1:
+        return run[0]
+    value = "".join([node.value for node in run])
+    return Text(value, Span(run[0].span.start, run[-1].span.end))
+
+
 def parse(source: str, filename: str = "input.pdoc") -> Document:
     """Convenience function: parse source text and return a Document AST."""
     tokens = tokenize(source, filename)
     return Parser(tokens, source, filename).parse()
+
+
+@lru_cache(maxsize=32)
+def parse_cached(source: str, filename: str = "input.pdoc") -> Document:
+    """Like parse(), but reuse the Document when the same source is parsed again.
+
+    Keyed on content rather than file mtime, so an edit is never served a
+    stale AST. AST nodes are immutable, so cached Documents can be shared.
+    """
+    return parse(source, filename)
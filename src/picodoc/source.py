@@ -0,0 +1,18 @@
+"""Source file loading."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+
+def read_source(path: Path) -> str:
+    """Read a UTF-8 source file with universal newlines.
+
+    Decodes the whole file in one call instead of streaming it through a
+    text-mode wrapper; CR and CRLF line endings are still normalised to LF,
+    matching ``Path.read_text``.
+    """
+    text = path.read_bytes().decode("utf-8")
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
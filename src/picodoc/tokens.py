@@ -1,9 +1,14 @@
-"""Token types, data structures, and character classification helpers."""
+"""Token types, data structures, and character classification helpers.
+
+Position, Span and Token are NamedTuples, like the AST nodes: the lexer
+builds several per token, and tuple construction is much cheaper than a
+frozen dataclass.
+"""
 
 from __future__ import annotations
 
-from dataclasses import dataclass
 from enum import Enum, auto
+from typing import NamedTuple
 
 
 class TokenType(Enum):
@@ -37,9 +42,13 @@ class TokenType(Enum):
 
     EOF = auto()
 
+    # Members are singletons, so identity hashing is consistent with equality.
+    # Enum's default __hash__ is a Python-level hash of the name, which made
+    # the parser's stop-set membership tests several times slower.
+    __hash__ = object.__hash__
+
 
-@dataclass(frozen=True, slots=True)
-class Position:
+class Position(NamedTuple):
     """Source position, 1-based line and column, 0-based byte offset."""
 
     line: int
@@ -47,16 +56,14 @@ class Position:
     offset: int
 
 
-@dataclass(frozen=True, slots=True)
-class Span:
+class Span(NamedTuple):
     """Source range from start to end position."""
 
     start: Position
     end: Position
 
 
-@dataclass(frozen=True, slots=True)
-class Token:
+class Token(NamedTuple):
     """A single lexer token with resolved value and original source text."""
 
     type: TokenType
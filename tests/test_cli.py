@@ -14,6 +14,7 @@ from picodoc.cli import (
     parse_env_arg,
     parse_meta_arg,
 )
+from picodoc.parser import parse_cached
 
 # ---------------------------------------------------------------------------
 # Argument parsing helpers
@@ -211,3 +212,101 @@ class TestCompileFile:
         )
         html = compile_file(opts)
         assert "<h1>Hello World</h1>" in html
+
+    def test_unchanged_source_reuses_ast(self, tmp_path: Path) -> None:
+        doc = tmp_path / "cached.pdoc"
+        doc.write_text("#title: Cached\n")
+        opts = CliOptions(
+            input_file=doc,
+            output_file=None,
+            env={},
+            css_files=[],
+            js_files=[],
+            meta_tags=[],
+            filter_paths=[],
+            filter_timeout=5.0,
+            watch=False,
+            debug=False,
+        )
+        compile_file(opts)
+        hits = parse_cached.cache_info().hits
+        assert "<h1>Cached</h1>" in compile_file(opts)
+        assert parse_cached.cache_info().hits == hits + 1
+
+        doc.write_text("#title: Changed\n")
+        assert "<h1>Changed</h1>" in compile_file(opts)
+        assert parse_cached.cache_info().hits == hits + 1
+
+    @pytest.mark.parametrize("newline", ["\r\n", "\r"])
+    def test_non_lf_line_endings_normalised(self, tmp_path: Path, newline: str) -> None:
+        source = '#title: Hello\n\n#code: """\n  a\n  b\n  """\n'
+        lf_doc = tmp_path / "lf.pdoc"
+        lf_doc.write_bytes(source.encode())
+        other_doc = tmp_path / "other.pdoc"
+        other_doc.write_bytes(source.replace("\n", newline).encode())
+        lf_out = tmp_path / "lf.html"
+        other_out = tmp_path / "other.html"
+        assert main([str(lf_doc), "-o", str(lf_out)]) == 0
+        assert main([str(other_doc), "-o", str(other_out)]) == 0
+        assert other_out.read_text() == lf_out.read_text()
+
+
+# ---------------------------------------------------------------------------
+# Output writing
+# ---------------------------------------------------------------------------
+
+
+class TestOutput:
+    def test_stdout_is_utf8(self, tmp_path: Path, capfd: pytest.CaptureFixture[str]) -> None:
+        doc = tmp_path / "doc.pdoc"
+        doc.write_text("#title: Caf\\xe9\n", encoding="utf-8")
+        assert main([str(doc)]) == 0
+        out = capfd.readouterr().out
+        assert out.startswith("<!DOCTYPE html>")
+        assert "<h1>Caf&#xE9;</h1>" in out
+
+    def test_output_file_bytes(self, tmp_path: Path) -> None:
+        doc = tmp_path / "doc.pdoc"
+        doc.write_text("#title: Hi\n")
+        out = tmp_path / "out.html"
+        assert main([str(doc), "-o", str(out)]) == 0
+        data = out.read_bytes()
+        assert b"<h1>Hi</h1>\n" in data
+        assert b"\r" not in data
+
+
+# ---------------------------------------------------------------------------
+# Watch mode (watchfiles)
+# ---------------------------------------------------------------------------
+
+
+class TestWatchfiles:
+    def test_recompiles_and_survives_missing_input(
+        self,
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+        capsys: pytest.CaptureFixture[str],
+    ) -> None:
+        watchfiles = pytest.importorskip("watchfiles")
+        doc = tmp_path / "doc.pdoc"
+        out = tmp_path / "doc.html"
+        doc.write_text("#title: One\n")
+
+        def fake_watch(path, *, watch_filter, recursive):
+            target = str(doc.resolve())
+            assert watch_filter(watchfiles.Change.modified, target)
+            assert not watch_filter(watchfiles.Change.deleted, target)
+            assert not watch_filter(watchfiles.Change.modified, str(tmp_path / "other"))
+            doc.write_text("#title: Two\n")
+            yield {(watchfiles.Change.modified, target)}
+            assert "<h1>Two</h1>" in out.read_text()
+            # Input vanishes between the event and the recompile
+            doc.unlink()
+            yield {(watchfiles.Change.added, target)}
+            doc.write_text("#title: Three\n")
+            yield {(watchfiles.Change.added, target)}
+
+        monkeypatch.setattr(watchfiles, "watch", fake_watch)
+        assert main([str(doc), "-o", str(out), "--watch"]) == 0
+        assert "<h1>Three</h1>" in out.read_text()
+        assert "error:" in capsys.readouterr().err
@@ -96,6 +96,16 @@ class TestConfigMerge:
         opts = resolve_options(ns)
         assert opts.filter_timeout == 3.0
 
+    def test_persistent_filters_merge_config_and_cli(self, tmp_path: Path) -> None:
+        cfg = tmp_path / "picodoc.toml"
+        cfg.write_text('[filters]\npersistent = ["highlight"]\n')
+        doc = tmp_path / "doc.pdoc"
+        doc.write_text("")
+        p = build_parser()
+        ns = p.parse_args([str(doc), "--persistent-filter", "plot"])
+        opts = resolve_options(ns)
+        assert opts.persistent_filters == frozenset({"highlight", "plot"})
+
     def test_explicit_config_flag(self, tmp_path: Path) -> None:
         cfg = tmp_path / "alt.toml"
         cfg.write_text('[env]\nkey = "val"\n')
@@ -105,3 +115,19 @@ class TestConfigMerge:
         ns = p.parse_args([str(doc), "--config", str(cfg)])
         opts = resolve_options(ns)
         assert opts.env == {"key": "val"}
+
+    def test_mistyped_config_entries_ignored(self, tmp_path: Path) -> None:
+        cfg = tmp_path / "picodoc.toml"
+        cfg.write_text(
+            'env = "x"\ncss = ["a.css"]\n[js]\nfiles = "app.js"\n[filters]\ntimeout = "slow"\n'
+        )
+        doc = tmp_path / "doc.pdoc"
+        doc.write_text("")
+        p = build_parser()
+        ns = p.parse_args([str(doc), "--js", "cli.js"])
+        opts = resolve_options(ns)
+        assert opts.env == {}
+        assert opts.css_files == []
+        assert opts.js_files == ["cli.js"]
+        assert opts.filter_paths == []
+        assert opts.filter_timeout == 5.0
@@ -0,0 +1,44 @@
+"""Tests for the --debug AST dump."""
+
+from __future__ import annotations
+
+import io
+
+from picodoc.debug import dump_ast
+from picodoc.parser import parse
+
+
+def _dump(source: str) -> str:
+    buf = io.StringIO()
+    dump_ast(parse(source), file=buf)
+    return buf.getvalue()
+
+
+class TestDumpAst:
+    def test_paragraph_with_escape(self) -> None:
+        assert _dump("Hello \\# world\n") == (
+            "Document\n  Paragraph\n    Text('Hello ')\n    Escape('#')\n    Text(' world')\n"
+        )
+
+    def test_args_inline_values(self) -> None:
+        out = _dump('[#set name=greet who=? title="Hi \\[#who]" ref=#x raw="""r""": body]\n')
+        assert "  MacroCall [#...]set\n" in out
+        assert "    Arg name=Text('greet')\n" in out
+        assert "    Arg who=?\n" in out
+        assert "    Arg title=InterpString(Text('Hi ')Code[...])\n" in out
+        assert "    Arg ref=MacroCall(#x)\n" in out
+        assert "    Arg raw=RawString('r')\n" in out
+        assert "    Body\n      Text('body')\n" in out
+
+    def test_string_bodies(self) -> None:
+        out = _dump('#b"one \\[#i: two]"\n#code: """raw"""\n')
+        assert (
+            "  MacroCall #b\n"
+            "    InterpString\n"
+            "      Text('one ')\n"
+            "      CodeSection\n"
+            "        MacroCall #i\n"
+            "          Body\n"
+            "            Text('two')\n"
+        ) in out
+        assert "  MacroCall #code\n    RawString('raw')\n" in out
@@ -69,3 +69,17 @@ class TestErrorFormatting:
             tokenize(source)
         formatted = exc_info.value.format()
         assert "3:1" in formatted
+
+    def test_format_line_with_crlf(self):
+        with pytest.raises(LexError) as exc_info:
+            tokenize("first\r\nsecond \\q\r\nthird")
+        formatted = exc_info.value.format()
+        assert "2 | second \\q\n" in formatted
+        assert "\r" not in formatted
+
+    def test_format_error_at_end_of_source(self):
+        with pytest.raises(LexError) as exc_info:
+            tokenize("text\n\\")
+        formatted = exc_info.value.format()
+        assert "2:1" in formatted
+        assert "2 | \\\n" in formatted
@@ -141,6 +141,17 @@ class TestIfeq:
         result = evaluate(doc)
         assert len(result.children) == 0
 
+    def test_ifeq_duplicate_arg_first_wins(self) -> None:
+        doc = _doc(
+            _call(
+                "ifeq",
+                (_arg("lhs", "a"), _arg("rhs", "a"), _arg("lhs", "b")),
+                _body(_call("p", body=_body(_text("match")))),
+            ),
+        )
+        result = evaluate(doc)
+        assert len(result.children) == 1
+
 
 class TestIfne:
     def test_ifne_true(self) -> None:
@@ -199,6 +210,28 @@ class TestInclude:
         p = result.children[0]
         assert isinstance(p, MacroCall) and p.name == "p"
 
+    def test_repeated_sibling_include(self, tmp_path: Path) -> None:
+        (tmp_path / "part.pdoc").write_text("#p: Again\n")
+        main = tmp_path / "main.pdoc"
+        main.write_text('[#include file="part.pdoc"]\n[#include file="part.pdoc"]\n')
+
+        doc = parse(main.read_text(), str(main))
+        result = evaluate(doc, str(main))
+
+        assert [c.name for c in result.children] == ["p", "p"]
+
+    def test_repeated_include_parsed_once(self, tmp_path: Path) -> None:
+        from picodoc.parser import parse_cached
+
+        (tmp_path / "part.pdoc").write_text("#p: Cached\n")
+        main = tmp_path / "main.pdoc"
+        main.write_text('[#include file="part.pdoc"]\n' * 3)
+
+        doc = parse(main.read_text(), str(main))
+        hits = parse_cached.cache_info().hits
+        evaluate(doc, str(main))
+        assert parse_cached.cache_info().hits == hits + 2
+
     def test_circular_include(self, tmp_path: Path) -> None:
         a = tmp_path / "a.pdoc"
         b = tmp_path / "b.pdoc"
@@ -345,6 +378,56 @@ class TestValueResolution:
         ref = _call("version")
         assert _resolve_value(ref, ctx) == "1.0"
 
+    def test_macro_ref_value_after_redefinition(self) -> None:
+        from picodoc.eval import _resolve_value
+
+        ctx = EvalContext(filename="test.pdoc", source_dir=Path("."))
+        ctx.definitions["version"] = _call("set", body=_body(_text("1.0")))
+        ref = _call("version")
+        assert _resolve_value(ref, ctx) == "1.0"
+        ctx.definitions["version"] = _call("set", body=_body(_text("2.0")))
+        assert _resolve_value(ref, ctx) == "2.0"
+
+
+class TestStaticReuse:
+    def test_body_without_macros_reused(self) -> None:
+        from picodoc.eval import _recurse_body
+
+        ctx = EvalContext(filename="test.pdoc", source_dir=Path("."))
+        body = _body(_text("plain "), Escape("*", S), _text("text"))
+        assert _recurse_body(body, ctx) is body
+
+    def test_body_with_macro_rebuilt(self) -> None:
+        from picodoc.eval import _recurse_body
+
+        ctx = EvalContext(filename="test.pdoc", source_dir=Path("."))
+        ctx.definitions["name"] = _call("set", body=_body(_text("World")))
+        body = _body(_text("Hello "), _call("name"))
+        result = _recurse_body(body, ctx)
+        assert result is not body
+        assert isinstance(result, Body)
+        assert [c.value for c in result.children if isinstance(c, Text)] == ["Hello ", "World"]
+
+    def test_static_interp_string_reused(self) -> None:
+        from picodoc.eval import _recurse_body
+
+        ctx = EvalContext(filename="test.pdoc", source_dir=Path("."))
+        s = InterpString((_text("hello "), _text("world")), S)
+        assert _recurse_body(s, ctx) is s
+
+    def test_interp_string_with_code_rebuilt(self) -> None:
+        from picodoc.eval import _recurse_body
+
+        ctx = EvalContext(filename="test.pdoc", source_dir=Path("."))
+        ctx.definitions["name"] = _call("set", body=_body(_text("World")))
+        s = InterpString((_text("Hello "), CodeSection((_call("name"),), S)), S)
+        result = _recurse_body(s, ctx)
+        assert result is not s
+        assert isinstance(result, InterpString)
+        code = result.parts[1]
+        assert isinstance(code, CodeSection)
+        assert code.body == (_text("World"),)
+
 
 def _req() -> RequiredMarker:
     return RequiredMarker(S)
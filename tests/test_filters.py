@@ -147,3 +147,129 @@ class TestFilterInvocation:
         assert fpath is not None
         with pytest.raises(EvalError, match="timed out"):
             reg.invoke_filter("slow", fpath, {}, None, {}, _SPAN)
+
+    def test_non_ascii_round_trip(self, tmp_path: Path) -> None:
+        script = textwrap.dedent("""\
+            #!/usr/bin/env python3
+            import json, sys
+            data = json.load(sys.stdin)
+            sys.stdout.buffer.write(f"#p: {data['body']} \u2713".encode("utf-8"))
+        """)
+        fpath = tmp_path / "filters" / "uni"
+        fpath.parent.mkdir(parents=True, exist_ok=True)
+        fpath.write_text(script)
+        fpath.chmod(fpath.stat().st_mode | stat.S_IEXEC)
+
+        reg = FilterRegistry(document_dir=tmp_path)
+        result = reg.invoke_filter("uni", fpath, {}, "caf\u00e9", {}, _SPAN)
+        assert result == "#p: caf\u00e9 \u2713"
+
+    def test_invalid_utf8_output_raises(self, tmp_path: Path) -> None:
+        _make_filter_script(tmp_path / "filters" / "latin", "printf 'caf\\351'")
+        reg = FilterRegistry(document_dir=tmp_path)
+        fpath = reg.find_filter("latin")
+        assert fpath is not None
+        with pytest.raises(EvalError, match="not valid UTF-8"):
+            reg.invoke_filter("latin", fpath, {}, None, {}, _SPAN)
+
+    def test_missing_executable_raises(self, tmp_path: Path) -> None:
+        reg = FilterRegistry(document_dir=tmp_path)
+        fpath = tmp_path / "filters" / "missing"
+        with pytest.raises(EvalError, match="filter 'missing' could not be started"):
+            reg.invoke_filter("missing", fpath, {}, None, {}, _SPAN)
+
+
+_PERSISTENT_SCRIPT = textwrap.dedent("""\
+    #!/usr/bin/env python3
+    import json, os, sys
+    for line in sys.stdin:
+        data = json.loads(line)
+        if data.get("mode") == "fail":
+            reply = {"error": "bad input"}
+        elif data.get("mode") == "exit":
+            print("shutting down", file=sys.stderr)
+            sys.exit(0)
+        elif data.get("mode") == "latin":
+            sys.stdout.buffer.write(b'{"output": "caf\\xe9"}\\n')
+            sys.stdout.flush()
+            continue
+        else:
+            reply = {"output": f"#p: {data['greeting']} from {os.getpid()}"}
+        print(json.dumps(reply), flush=True)
+""")
+
+
+class TestPersistentFilter:
+    def _registry(self, tmp_path: Path) -> tuple[FilterRegistry, Path]:
+        fpath = tmp_path / "filters" / "keep"
+        fpath.parent.mkdir(parents=True, exist_ok=True)
+        fpath.write_text(_PERSISTENT_SCRIPT)
+        fpath.chmod(fpath.stat().st_mode | stat.S_IEXEC)
+        reg = FilterRegistry(document_dir=tmp_path, persistent=frozenset({"keep"}))
+        return reg, fpath
+
+    def test_process_reused_across_calls(self, tmp_path: Path) -> None:
+        reg, fpath = self._registry(tmp_path)
+        try:
+            first = reg.invoke_filter("keep", fpath, {"greeting": "hi"}, None, {}, _SPAN)
+            second = reg.invoke_filter("keep", fpath, {"greeting": "yo"}, None, {}, _SPAN)
+        finally:
+            reg.close()
+        assert first.startswith("#p: hi from ")
+        assert second.startswith("#p: yo from ")
+        assert first.split()[-1] == second.split()[-1]
+
+    def test_error_response_raises(self, tmp_path: Path) -> None:
+        reg, fpath = self._registry(tmp_path)
+        try:
+            with pytest.raises(EvalError, match="filter 'keep' failed: bad input"):
+                reg.invoke_filter("keep", fpath, {"mode": "fail"}, None, {}, _SPAN)
+        finally:
+            reg.close()
+
+    def test_unexpected_exit_raises(self, tmp_path: Path) -> None:
+        reg, fpath = self._registry(tmp_path)
+        try:
+            with pytest.raises(EvalError, match="exited unexpectedly"):
+                reg.invoke_filter("keep", fpath, {"mode": "exit"}, None, {}, _SPAN)
+        finally:
+            reg.close()
+
+    def test_unexpected_exit_includes_stderr(self, tmp_path: Path) -> None:
+        reg, fpath = self._registry(tmp_path)
+        with reg, pytest.raises(EvalError, match="exited unexpectedly: shutting down"):
+            reg.invoke_filter("keep", fpath, {"mode": "exit"}, None, {}, _SPAN)
+
+    def test_invalid_utf8_response_raises(self, tmp_path: Path) -> None:
+        reg, fpath = self._registry(tmp_path)
+        with reg:
+            with pytest.raises(EvalError, match="not valid UTF-8"):
+                reg.invoke_filter("keep", fpath, {"mode": "latin"}, None, {}, _SPAN)
+            # The process survives a bad response
+            result = reg.invoke_filter("keep", fpath, {"greeting": "hi"}, None, {}, _SPAN)
+        assert result.startswith("#p: hi from ")
+
+    def test_missing_executable_raises(self, tmp_path: Path) -> None:
+        reg = FilterRegistry(document_dir=tmp_path, persistent=frozenset({"missing"}))
+        fpath = tmp_path / "filters" / "missing"
+        with reg, pytest.raises(EvalError, match="filter 'missing' could not be started"):
+            reg.invoke_filter("missing", fpath, {}, None, {}, _SPAN)
+
+    def test_context_manager_closes_processes(self, tmp_path: Path) -> None:
+        reg, fpath = self._registry(tmp_path)
+        with reg:
+            reg.invoke_filter("keep", fpath, {"greeting": "hi"}, None, {}, _SPAN)
+            process = reg._processes["keep"]
+        assert not reg._processes
+        assert process.proc.returncode == 0
+
+    def test_timeout_raises(self, tmp_path: Path) -> None:
+        _make_filter_script(tmp_path / "filters" / "stall", "sleep 10")
+        reg = FilterRegistry(document_dir=tmp_path, timeout=0.2, persistent=frozenset({"stall"}))
+        fpath = reg.find_filter("stall")
+        assert fpath is not None
+        try:
+            with pytest.raises(EvalError, match="timed out"):
+                reg.invoke_filter("stall", fpath, {}, None, {}, _SPAN)
+        finally:
+            reg.close()
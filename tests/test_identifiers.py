@@ -87,6 +87,12 @@ class TestIdentifierLexing:
         assert types[0] == TokenType.IDENTIFIER
         assert types[1] == TokenType.STRING_START
 
+    def test_numeric_symbol_is_text(self, lex):
+        # "½" is numeric but not a digit, so it splits the identifier
+        tokens = lex("a\u00bdb\u00e9")
+        assert_types(tokens, [TokenType.IDENTIFIER, TokenType.TEXT, TokenType.IDENTIFIER])
+        assert_values(tokens, ["a", "\u00bd", "b\u00e9"])
+
 
 class TestIdentifierPositions:
     def test_position_tracking(self, lex):
@@ -2,23 +2,26 @@
 
 from __future__ import annotations
 
+import asyncio
+
 import pytest
 from lsprotocol.types import (
     DiagnosticSeverity,
+    DidChangeTextDocumentParams,
     PublishDiagnosticsParams,
     TextDocumentItem,
     TextDocumentSyncKind,
+    VersionedTextDocumentIdentifier,
 )
-from pygls.lsp.server import LanguageServer
 from pygls.workspace import Workspace
 
-from picodoc.lsp import _validate
+from picodoc.lsp import _DEBOUNCE_SECONDS, PicoDocLanguageServer, _validate, did_change
 
 
 @pytest.fixture
 def lsp_env():
     """Create a LanguageServer with an initialized workspace and captured diagnostics."""
-    ls = LanguageServer("test", "v0", text_document_sync_kind=TextDocumentSyncKind.Full)
+    ls = PicoDocLanguageServer("test", "v0", text_document_sync_kind=TextDocumentSyncKind.Full)
     ws = Workspace(None)
     ls.protocol._workspace = ws
 
@@ -129,3 +132,70 @@ class TestPositionConversion:
         # Error is on line 2 (1-based) → LSP line 1 (0-based)
         assert d.range.start.line == 1
         assert d.range.start.character == 0
+
+
+# ---------------------------------------------------------------------------
+# Change notifications — debounced, skipped when unchanged
+# ---------------------------------------------------------------------------
+
+
+def _change(uri: str) -> DidChangeTextDocumentParams:
+    return DidChangeTextDocumentParams(
+        text_document=VersionedTextDocumentIdentifier(uri=uri, version=1), content_changes=[]
+    )
+
+
+class TestDidChange:
+    def test_rapid_changes_validate_once(self, lsp_env) -> None:
+        ls, published, put = lsp_env
+        uri = "file:///debounce.pdoc"
+
+        async def edit() -> None:
+            for text in ("#b: one", "#b: two", "#td: three"):
+                put(text, uri)
+                did_change(ls, _change(uri))
+            await asyncio.sleep(_DEBOUNCE_SECONDS * 2)
+
+        asyncio.run(edit())
+        assert len(published) == 1
+        assert published[0].diagnostics[0].severity == DiagnosticSeverity.Warning
+
+    def test_unchanged_source_not_revalidated(self, lsp_env) -> None:
+        ls, published, put = lsp_env
+        uri = "file:///same.pdoc"
+        put("Some text", uri)
+        _validate(ls, uri)
+
+        async def edit() -> None:
+            did_change(ls, _change(uri))
+            await asyncio.sleep(_DEBOUNCE_SECONDS * 2)
+
+        asyncio.run(edit())
+        assert len(published) == 1
+
+    def test_validation_error_reported(self, lsp_env, monkeypatch) -> None:
+        ls, published, put = lsp_env
+        uri = "file:///broken.pdoc"
+        put("Some text", uri)
+        reported: list[Exception] = []
+        monkeypatch.setattr(ls, "report_server_error", lambda exc, source: reported.append(exc))
+        monkeypatch.setattr("picodoc.lsp.parse", lambda source, filename: 1 / 0)
+
+        async def edit() -> None:
+            did_change(ls, _change(uri))
+            await asyncio.sleep(_DEBOUNCE_SECONDS * 2)
+
+        asyncio.run(edit())
+        assert published == []
+        assert len(reported) == 1
+        assert isinstance(reported[0], ZeroDivisionError)
+        assert not ls.pending
+
+    def test_state_is_per_server(self, lsp_env) -> None:
+        ls, _, put = lsp_env
+        uri = "file:///shared.pdoc"
+        put("Some text", uri)
+        _validate(ls, uri)
+        other = PicoDocLanguageServer("other", "v0")
+        assert uri in ls.validated
+        assert other.validated == {}
@@ -101,3 +101,8 @@ class TestNewline:
     def test_multiple_newlines(self, lex):
         tokens = lex("\n\n")
         assert_types(tokens, [TokenType.NEWLINE, TokenType.NEWLINE])
+
+    def test_lone_cr_is_text(self, lex):
+        tokens = lex("a\rb")
+        assert_types(tokens, [TokenType.IDENTIFIER, TokenType.TEXT, TokenType.IDENTIFIER])
+        assert tokens[1].value == "\r"